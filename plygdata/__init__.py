@@ -9,17 +9,42 @@ from plygdata.scalelinear import ScaleLinear
 from plygdata.datacolor import DataColor
 from plygdata.datahelper import \
     split_data,\
+    kfold_split_data,\
+    repeated_split_data,\
     get_playground_figure,\
     get_playground_axes,\
     plot_points, \
     plot_points_with_playground_style,\
     draw_decision_boundary,\
+    predict_boundary,\
+    clear_prediction_cache,\
+    get_node_decision_boundaries,\
     plot_sample, \
     predict_classes, \
     predict_proba, \
     predict_classes_proba
 from plygdata.dataset import  \
-    generate_data
+    generate_data, \
+    rand_uniform_batch, \
+    normal_random_batch, \
+    generate_data_batch, \
+    generate_data_chunks, \
+    generate_data_sharded, \
+    get_points_dtype, \
+    as_points, \
+    gaussian_label, \
+    NoiseResampler, \
+    NumpyDataGenerator
+from plygdata.datacache import DataCache
+from plygdata.dataloader import BatchLoader
+from plygdata.datashards import \
+    save_shards, \
+    save_split_shards, \
+    load_shards
+from plygdata.boundaryrecorder import BoundaryRecorder
+from plygdata.nn import Network
+from plygdata.population import Population
+from plygdata.sweep import get_sweep_configs, run_config, run_sweep, load_sweep_results
 from plygdata.playground import Player
-from plygdata.state import DatasetType, InputType
+from plygdata.state import DatasetType, InputType, BackendType, LayerType, NeuronType
 
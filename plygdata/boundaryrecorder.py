@@ -0,0 +1,224 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import numpy as np
+from plygdata.playground import Player, DENSITY
+
+
+class _Callback(object):
+    '''
+     The interface of keras.callbacks.Callback, used as the base class of BoundaryRecorder
+     when Keras is not installed.
+    '''
+
+    def __init__(self):
+        self.model = None
+        self.params = None
+
+    def set_model(self, model):
+        self.model = model
+
+    def set_params(self, params):
+        self.params = params
+
+    def _noop(self, *args, **kwargs):
+        pass
+
+    on_train_begin = on_train_end = on_epoch_begin = on_epoch_end = _noop
+    on_batch_begin = on_batch_end = on_train_batch_begin = on_train_batch_end = _noop
+    on_test_begin = on_test_end = on_test_batch_begin = on_test_batch_end = _noop
+    on_predict_begin = on_predict_end = on_predict_batch_begin = on_predict_batch_end = _noop
+
+
+# A real Keras callback when Keras is installed, since Keras calls its private hooks on the callbacks.
+try:
+    from tensorflow.keras.callbacks import Callback as _Callback
+except ImportError:
+    try:
+        from keras.callbacks import Callback as _Callback
+    except ImportError:
+        pass
+
+
+class BoundaryRecorder(_Callback):
+    '''
+     Records the decision boundary of a model while it is trained, as a Keras callback:
+         recorder = BoundaryRecorder(every=1, unit='epoch', capacity=200)
+         model.fit(X_train, y_train, epochs=200, callbacks=[recorder])
+         frames = recorder.get_frames()
+         anim = recorder.to_animation()
+
+     The grid is built once, and each record is one predict_on_batch (or predict) over it.
+     The frames are kept in a preallocated ring buffer of `capacity` frames, so that only
+     the last `capacity` frames are kept. With dtype=np.uint8, the values in value_range
+     are quantized to 256 levels (a 100x100 frame takes 10KB).
+    '''
+
+    def __init__(self, every=1, unit='epoch', capacity=100, density=DENSITY, input_ids=None,
+                 discretize=False, dtype=np.float16, value_range=(-1.0, 1.0), output_index=0):
+        '''
+        :param every: records every `every` epochs or batches
+        :param unit: 'epoch' or 'batch'
+        :param capacity: max number of frames kept (the oldest frames are overwritten)
+        :param density: number of rows and columns of the grid
+        :param input_ids: list of InputType ids the model takes as its inputs (default: x and y)
+        :param discretize: -1 or 1 instead of the values
+        :param dtype: dtype of the frames: np.float16, np.float32 or np.uint8 (quantized)
+        :param value_range: (min, max) of the outputs, used for the quantization to np.uint8
+        :param output_index: column of the output of the model to record
+        '''
+        super(BoundaryRecorder, self).__init__()
+        if every <= 0:
+            raise ValueError("every must be positive.")
+        if unit not in ('epoch', 'batch'):
+            raise ValueError("unit must be 'epoch' or 'batch'.")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+
+        self.every = every
+        self.unit = unit
+        self.capacity = capacity
+        self.density = density
+        self.discretize = discretize
+        self.dtype = np.dtype(dtype)
+        self.value_range = value_range
+        self.output_index = output_index
+
+        self.grid = Player.get_boundary_array(density=density, input_ids=input_ids)
+        self._frames = np.zeros((capacity, density, density), dtype=self.dtype)
+        self._steps = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        self._batch = 0
+
+
+    def __len__(self):
+        ''' Number of frames kept. '''
+        return min(self._count, self.capacity)
+
+
+    def record(self, step, model=None):
+        '''
+        Evaluates the model on the grid and stores the boundary as the frame of `step`.
+
+        :param step: epoch or batch number of the frame
+        :param model: a model with `predict_on_batch` or `predict` (default: the model of the training)
+        '''
+        model = self.model if model is None else model
+        if hasattr(model, 'predict_on_batch'):
+            # The predict of Keras builds a data adapter and a loop at each call, which costs more than
+            # a train step of a small network. The grid is one batch.
+            probability = model.predict_on_batch(self.grid)
+        else:
+            probability = model.predict(self.grid, batch_size=len(self.grid), verbose=0)
+        probability = np.asarray(probability).reshape(len(self.grid), -1)[:, self.output_index]
+        boundary = Player.get_decision_boundary_of_node(probability, self.discretize, self.density)
+
+        position = self._count % self.capacity
+        self._frames[position] = self._quantize(boundary)
+        self._steps[position] = step
+        self._count += 1
+
+
+    def get_frames(self, dequantize=True):
+        '''
+        :param dequantize: converts np.uint8 frames back to float32 values in value_range
+        :return: (frames, density, density) array of the frames kept, oldest first
+        '''
+        frames = self._frames[self._get_order()]
+        if dequantize and self.dtype == np.uint8:
+            low, high = self.value_range
+            frames = frames.astype(np.float32) * ((high - low) / 255) + low
+        return frames
+
+
+    def get_steps(self):
+        '''
+        :return: the epoch or batch numbers of the frames of get_frames
+        '''
+        return self._steps[self._get_order()]
+
+
+    def clear(self):
+        self._count = 0
+        self._batch = 0
+
+
+    def to_animation(self, fig=None, ax=None, interval=200, **kwargs):
+        '''
+        Makes a matplotlib animation of the frames, e.g. anim.save('boundary.gif', writer='pillow').
+
+        :param fig, ax: figure and axes to draw (default: a new figure)
+        :param interval: delay between the frames in milliseconds
+        :param kwargs: passed to FuncAnimation
+        :return: a matplotlib.animation.FuncAnimation
+        '''
+        import matplotlib.pyplot as plt
+        from matplotlib.animation import FuncAnimation
+        from plygdata.heatmap import HeatMap
+
+        frames = self.get_frames()
+        if len(frames) == 0:
+            raise ValueError("No frame has been recorded.")
+        if ax is None:
+            fig, ax = plt.subplots()
+        elif fig is None:
+            fig = ax.figure
+        steps = self.get_steps()
+
+        im = HeatMap.draw_decision_boundary_of_node(ax, frames[0])
+        title = ax.set_title('')
+
+        def update(i):
+            im.set_data(frames[i])
+            title.set_text('{} {}'.format(self.unit, steps[i]))
+            return im, title
+
+        return FuncAnimation(fig, update, frames=len(frames), interval=interval, **kwargs)
+
+
+    def _quantize(self, boundary):
+        if self.dtype != np.uint8:
+            return boundary
+        low, high = self.value_range
+        scaled = (np.asarray(boundary, dtype=np.float32) - low) * (255 / (high - low))
+        return np.clip(np.rint(scaled), 0, 255)
+
+
+    def _get_order(self):
+        if self._count <= self.capacity:
+            return np.arange(self._count)
+        return np.arange(self._count, self._count + self.capacity) % self.capacity
+
+
+    # Keras callback hooks
+
+    def on_train_begin(self, logs=None):
+        self._batch = 0
+
+    def on_epoch_end(self, epoch, logs=None):
+        if self.unit == 'epoch' and (epoch + 1) % self.every == 0:
+            self.record(epoch + 1)
+
+    def on_train_batch_end(self, batch, logs=None):
+        # The batch number restarts every epoch, so count the batches through the training.
+        self._batch += 1
+        if self.unit == 'batch' and self._batch % self.every == 0:
+            self.record(self._batch)
+
+    def on_batch_end(self, batch, logs=None):
+        self.on_train_batch_end(batch, logs)
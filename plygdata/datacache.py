@@ -0,0 +1,175 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import glob
+import os
+from collections import OrderedDict
+import numpy as np
+from plygdata.dataset import generate_data, get_num_samples
+from plygdata.state import BackendType
+
+
+class DataCache:
+    '''
+     Caches generated datasets, keyed by (data_type, noise, num_samples, seed, backend).
+     The first tier is an in-memory LRU limited to max_bytes. The second tier (optional) is a directory
+     of .npy files, which are loaded memory-mapped and shared by every process using the directory.
+     Only seeded calls of the NumPy backend are cached, since a call without a seed must return new data
+     (the Python backend ignores the seed, so its calls are never cached).
+     The cached arrays are read-only.
+    '''
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, directory=None, mmap_mode='r'):
+        '''
+        :param max_bytes: size limit of the in-memory tier
+        :param directory: directory of the on-disk tier (default: no on-disk tier)
+        :param mmap_mode: mmap_mode of np.load for the on-disk tier (None loads the file into memory)
+        '''
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+
+    def generate_data(self, data_type, noise=0.0, backend=BackendType.NumPy, seed=None, num_samples=None):
+        '''
+        Same as plygdata.generate_data, but returns the cached data if there is, as a (n, 3) ndarray.
+        The default backend is the NumPy backend, the only one which is cached.
+        '''
+        if seed is None or backend != BackendType.NumPy:
+            self.uncached += 1
+            return self._generate(data_type, noise, backend, seed, num_samples)
+
+        key = self._get_key(data_type, noise, backend, seed, num_samples)
+
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+        path = self._get_path(key)
+        if path is not None and os.path.exists(path):
+            data = np.load(path, mmap_mode=self.mmap_mode)
+            self.disk_hits += 1
+        else:
+            data = self._generate(data_type, noise, backend, seed, num_samples)
+            if data is None:
+                return None
+            if path is not None:
+                self._save(path, data)
+                if self.mmap_mode is not None:
+                    data = np.load(path, mmap_mode=self.mmap_mode)
+            self.misses += 1
+
+        data.flags.writeable = False
+        self._put(key, data)
+        return data
+
+
+    def invalidate(self, data_type, noise=0.0, backend=BackendType.NumPy, seed=None, num_samples=None):
+        '''
+        Removes one dataset from the both tiers.
+
+        :return: True if the dataset was cached.
+        '''
+        key = self._get_key(data_type, noise, backend, seed, num_samples)
+        found = False
+
+        data = self._entries.pop(key, None)
+        if data is not None:
+            self._bytes -= data.nbytes
+            found = True
+
+        path = self._get_path(key)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+            found = True
+
+        return found
+
+
+    def clear(self):
+        ''' Removes every dataset from the both tiers. '''
+        self._entries.clear()
+        self._bytes = 0
+        if self.directory is not None:
+            for path in glob.glob(os.path.join(self.directory, '*.npy')):
+                os.remove(path)
+
+
+    def stats(self):
+        '''
+        :return: a dict of the hit/miss statistics and the size of the in-memory tier.
+            'uncached' counts the calls which can't be cached (without a seed, or of the Python backend).
+        '''
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'uncached': self.uncached,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
+
+
+    @staticmethod
+    def _generate(data_type, noise, backend, seed, num_samples):
+        data = generate_data(data_type, noise, backend=backend, seed=seed, num_samples=num_samples)
+        if data is None:
+            return None
+        return np.asarray(data, dtype=float)
+
+
+    @staticmethod
+    def _get_key(data_type, noise, backend, seed, num_samples):
+        return (data_type, float(noise), get_num_samples(data_type, num_samples), seed, backend)
+
+
+    def _get_path(self, key):
+        if self.directory is None:
+            return None
+        data_type, noise, num_samples, seed, backend = key
+        # Same naming as the sample_data files: e.g. "circle-noise_0.1-samples_500-seed_1-numpy.npy"
+        name = '{}-noise_{!r}-samples_{}-seed_{}-{}.npy'.format(data_type, noise, num_samples, seed, backend)
+        return os.path.join(self.directory, name)
+
+
+    @staticmethod
+    def _save(path, data):
+        # Write to a temporary file first, so that other processes never load a partial file.
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(temp_path, path)
+
+
+    def _put(self, key, data):
+        self._entries[key] = data
+        self._bytes += data.nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 0:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
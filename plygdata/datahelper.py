@@ -16,13 +16,15 @@
 
 from __future__ import division
 
+import hashlib
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 import numpy as np
 from plygdata.dataset import generate_data
 from plygdata.state import InputType
 from plygdata.heatmap import HeatMap
-from plygdata.playground import Player
+from plygdata.playground import Player, DENSITY
 
 
 POINT_DOMAIN = [-6.0, 6.0]
@@ -30,14 +32,30 @@ TICKS_POINT = [-6, -5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5, 6]
 TICKS_MIDDLE = 6
 TICKS_VALUE = [-1, 0, 1]
 
+# Max number of label values (classes) split_data(stratify=True) accepts.
+STRATIFY_MAX_CLASSES = 32
 
-def split_data(data, validation_size=0.5, label_num=1, training_size=-1.0):
+PREDICTION_CACHE_SIZE = 16
+_predictions = OrderedDict()
+
+
+def split_data(data, validation_size=0.5, label_num=1, training_size=-1.0, inplace=False, stratify=False, return_indices=False, seed=None):
     '''
     Split data int training and validation data. And Each data will be split into input data and teacher labels.
+
+    By default, the data is copied into a new array and shuffled.
+    With any of inplace, stratify, return_indices or seed, a permutation index is shuffled instead:
+    the rows are gathered once into the split arrays (about one copy of the data at the peak),
+    or shuffled in place with inplace=True and returned as views.
+
     :param data:
     :param validation_size:
     :param label_num:
     :param training_size:
+    :param inplace: shuffle the rows of data (a writable ndarray) in place and return views of it
+    :param stratify: keep the proportion of each label value (class) in both splits
+    :param return_indices: return only the row indices (train_index, valid_index) into data
+    :param seed: seed of the shuffle (default: np.random when no other option is given)
     :return: (X_train, y_train, X_valid, y_valid)
     '''
 
@@ -45,6 +63,12 @@ def split_data(data, validation_size=0.5, label_num=1, training_size=-1.0):
     if len_data == 0:
         raise ValueError("No array error.")
 
+    if training_size >= 0.0 and training_size <= 1.0:
+        validation_size = 1.0 - training_size
+
+    if inplace or stratify or return_indices or seed is not None:
+        return _split_data_by_index(data, validation_size, label_num, inplace, stratify, return_indices, seed)
+
     mat = np.array(data)
 
     # It is easy to use scikit-learn.
@@ -56,11 +80,7 @@ def split_data(data, validation_size=0.5, label_num=1, training_size=-1.0):
     # But, because this class doesn't use scikit-learn.
     np.random.shuffle(mat)
 
-    X = mat[:, :-(label_num)]  # data
-    y = mat[:, -(label_num)]   # label
-
-    if training_size >= 0.0 and training_size <= 1.0:
-        validation_size = 1.0 - training_size
+    X, y = _split_xy(mat, label_num)
 
     split_point = round(len(mat) * (1.0 - validation_size))
     X_train = X[0:split_point, :] # train data
@@ -85,6 +105,167 @@ def split_data(data, validation_size=0.5, label_num=1, training_size=-1.0):
     return X_train, y_train, X_valid, y_valid
 
 
+def _split_xy(mat, label_num):
+    if mat.dtype.names is None:
+        X = mat[:, :-(label_num)]  # data
+        y = mat[:, -(label_num)]   # label
+    else:
+        # A record array (see get_points_dtype) keeps the dtypes of its fields.
+        names = mat.dtype.names
+        X = np.column_stack([mat[name] for name in names[:-(label_num)]])  # data
+        y = mat[names[-(label_num)]]                                        # label
+    return X, y
+
+
+def _get_split_indices(labels, validation_size, stratify, rng):
+    order = rng.permutation(len(labels))
+    if not stratify:
+        split_point = int(round(len(order) * (1.0 - validation_size)))
+        return order[:split_point], order[split_point:]
+
+    # Split the shuffled rows of each class at the same ratio, then mix the classes again.
+    classes = _get_classes(labels)[order]
+    train_index = []
+    valid_index = []
+    for c in range(classes.max() + 1):
+        members = order[classes == c]
+        split_point = int(round(len(members) * (1.0 - validation_size)))
+        train_index.append(members[:split_point])
+        valid_index.append(members[split_point:])
+    return rng.permutation(np.concatenate(train_index)), rng.permutation(np.concatenate(valid_index))
+
+
+def _split_data_by_index(data, validation_size, label_num, inplace, stratify, return_indices, seed):
+    if inplace and return_indices:
+        raise ValueError("inplace and return_indices can't be used together.")
+    if inplace and not isinstance(data, np.ndarray):
+        raise ValueError("inplace needs an ndarray.")
+
+    rng = np.random.default_rng(seed)
+    mat = np.asarray(data)
+
+    if inplace:
+        if stratify:
+            _, y = _split_xy(mat, label_num)
+            train_index, valid_index = _get_split_indices(y, validation_size, stratify, rng)
+            split_point = len(train_index)
+            # The rows are reordered through a temporary copy, train rows first.
+            mat[...] = mat[np.concatenate((train_index, valid_index))]
+        else:
+            rng.shuffle(mat)
+            split_point = int(round(len(mat) * (1.0 - validation_size)))
+        X, y = _split_xy(mat, label_num)
+        train_index = slice(0, split_point)
+        valid_index = slice(split_point, None)
+    else:
+        X, y = _split_xy(mat, label_num)
+        train_index, valid_index = _get_split_indices(y, validation_size, stratify, rng)
+        if return_indices:
+            return train_index, valid_index
+
+    return _take_split(X, y, train_index, valid_index, label_num)
+
+
+def _take_split(X, y, train_index, valid_index, label_num):
+    X_train = X[train_index]  # train data
+    y_train = y[train_index]  # train label
+    X_valid = X[valid_index]  # validation data
+    y_valid = y[valid_index]  # validation label
+
+    if label_num == 1:
+        y_train = np.reshape(y_train, [len(y_train), 1])
+        y_valid = np.reshape(y_valid, [len(y_valid), 1])
+
+    return X_train, y_train, X_valid, y_valid
+
+
+def _get_classes(labels):
+    # The class index of each row, for stratify. Continuous labels (e.g. of the regression datasets)
+    # would make each row its own class, and the split would put all the rows into one side.
+    values, classes = np.unique(labels, return_inverse=True)
+    counts = np.bincount(classes.ravel())
+    if len(values) > STRATIFY_MAX_CLASSES or counts.min() < 2:
+        raise ValueError("stratify needs class labels: {} label values, the rarest of which has {} rows.".format(len(values), counts.min()))
+    return classes.ravel()
+
+
+def kfold_split_data(data, n_splits=5, label_num=1, stratify=False, return_indices=False, seed=None):
+    '''
+    Generates K-fold cross-validation splits of data.
+    All the folds are taken from one backing array (data itself if it is an ndarray) by row indices,
+    so only the arrays of the current fold are gathered at a time.
+
+    :param data:
+    :param n_splits: number of folds (K)
+    :param label_num:
+    :param stratify: keep the proportion of each label value (class) in every fold
+    :param return_indices: yield the row indices (train_index, valid_index) into data instead of the arrays
+    :param seed: seed of the shuffle
+    :return: an iterator of (X_train, y_train, X_valid, y_valid) with the shapes of split_data
+    '''
+    mat = np.asarray(data)
+    if n_splits < 2 or n_splits > len(mat):
+        raise ValueError("n_splits must be between 2 and the length of data.")
+
+    rng = np.random.default_rng(seed)
+    X, y = _split_xy(mat, label_num)
+    order = rng.permutation(len(mat))
+
+    # The fold of each row of order.
+    if stratify:
+        classes = _get_classes(y)[order]
+        folds = np.empty(len(order), dtype=np.intp)
+        offset = 0
+        for c in range(classes.max() + 1):
+            members = np.flatnonzero(classes == c)
+            folds[members] = (np.arange(len(members)) + offset) % n_splits
+            offset += len(members)
+    else:
+        folds = np.arange(len(order)) * n_splits // len(order)
+
+    for fold in range(n_splits):
+        train_index = order[folds != fold]
+        valid_index = order[folds == fold]
+        if return_indices:
+            yield train_index, valid_index
+        else:
+            yield _take_split(X, y, train_index, valid_index, label_num)
+
+
+def repeated_split_data(data, n_repeats=10, validation_size=0.5, label_num=1, training_size=-1.0, stratify=False, return_indices=False, seed=None):
+    '''
+    Generates repeated random splits of data, each one as split_data would do.
+    All the splits are taken from one backing array (data itself if it is an ndarray) by row indices,
+    so only the arrays of the current split are gathered at a time.
+
+    :param data:
+    :param n_repeats: number of splits
+    :param validation_size:
+    :param label_num:
+    :param training_size:
+    :param stratify: keep the proportion of each label value (class) in both splits
+    :param return_indices: yield the row indices (train_index, valid_index) into data instead of the arrays
+    :param seed: seed of the shuffles
+    :return: an iterator of (X_train, y_train, X_valid, y_valid) with the shapes of split_data
+    '''
+    mat = np.asarray(data)
+    if len(mat) == 0:
+        raise ValueError("No array error.")
+
+    if training_size >= 0.0 and training_size <= 1.0:
+        validation_size = 1.0 - training_size
+
+    rng = np.random.default_rng(seed)
+    X, y = _split_xy(mat, label_num)
+
+    for _ in range(n_repeats):
+        train_index, valid_index = _get_split_indices(y, validation_size, stratify, rng)
+        if return_indices:
+            yield train_index, valid_index
+        else:
+            yield _take_split(X, y, train_index, valid_index, label_num)
+
+
 def get_playground_figure(enable_colorbar=False):
     if enable_colorbar:
         fig = plt.figure(figsize=(6, 6), dpi=100)
@@ -220,17 +401,150 @@ def predict_classes_proba(trained_model, x, batch_size=32, verbose=0):
     return discretized, probability
 
 
-def draw_decision_boundary(fig, ax, node_id=InputType.X1, trained_model=None, discretize=False, enable_colorbar=True):
+def draw_decision_boundary(fig, ax, node_id=InputType.X1, trained_model=None, discretize=False, enable_colorbar=True, input_ids=None, density=DENSITY, adaptive=False, tolerance=0.05, cache=True):
+    """
+    Draws the decision boundary of an input (node_id), or of the predictions of trained_model over the grid.
+    The predictions over the grid are cached per the weights of trained_model (see predict_boundary),
+    so redrawing a model whose weights haven't changed doesn't predict again.
+
+    :param fig: a Figure object of matplotlib
+    :param ax: the axes (Coordinate axis)
+    :param node_id: InputType id to draw when trained_model is None, or a (LayerType, NeuronType) id
+        of a node of trained_model (see get_node_decision_boundaries)
+    :param trained_model: a trained model with `predict`
+    :param discretize: draw -1 or 1 instead of the values
+    :param enable_colorbar: add a colorbar on the bottom
+    :param input_ids: list of InputType ids the trained_model takes as its inputs (default: x and y)
+    :param density: number of rows and columns of the grid (default: DENSITY)
+    :param adaptive: evaluate trained_model on a coarse grid and refine only near the boundary
+        (see Player.get_adaptive_decision_boundary)
+    :param tolerance: max difference between the corners of an interpolated cell, when adaptive
+    :param cache: use the cache of the predictions
+    :return: the image of the decision boundary
+    """
 
     if trained_model is None:
-        im = HeatMap.updateBackground(ax, None, node_id, discretize)
+        im = HeatMap.updateBackground(ax, None, node_id, discretize, density=density)
+    elif isinstance(node_id, tuple):
+        boundaries = get_node_decision_boundaries(trained_model, discretize, density, input_ids)
+        im = HeatMap.draw_decision_boundary_of_node(ax, boundaries[node_id])
+    elif adaptive:
+        boundary_of_node = Player.get_adaptive_decision_boundary(
+            lambda x: predict_proba(trained_model, x), discretize, density, tolerance, input_ids=input_ids)
+        im = HeatMap.draw_decision_boundary_of_node(ax, boundary_of_node)
     else:
-        boundary_array = Player.get_boundary_array()
-        probability = predict_proba(trained_model, boundary_array)
-        im = HeatMap.updateBackground(ax, None, None, discretize, probability)
+        probability = predict_boundary(trained_model, density, input_ids, cache)
+        im = HeatMap.updateBackground(ax, None, None, discretize, probability, density)
 
     if enable_colorbar:
         _add_colorbar_on_bottom(fig, ax, im)
 
     return im
 
+
+def predict_boundary(trained_model, density=DENSITY, input_ids=None, cache=True):
+    """
+    Predicts over the grid of Player.get_boundary_array.
+    The predictions are cached in a LRU of PREDICTION_CACHE_SIZE entries, keyed by the fingerprint of
+    the weights of trained_model (`get_weights()`) and the grid, so only new weights predict again.
+    A model without `get_weights` is never cached.
+
+    :param trained_model: a trained model with `predict`
+    :param density: number of rows and columns of the grid (default: DENSITY)
+    :param input_ids: list of InputType ids the trained_model takes as its inputs (default: x and y)
+    :param cache: use the cache
+    :return: the predictions (read-only when cached)
+    """
+    boundary_array = Player.get_boundary_array(density=density, input_ids=input_ids)
+    if not cache or not hasattr(trained_model, 'get_weights'):
+        return predict_proba(trained_model, boundary_array)
+
+    key = (_get_weights_fingerprint(trained_model), density, tuple(POINT_DOMAIN),
+           None if input_ids is None else tuple(input_ids))
+    probability = _predictions.get(key)
+    if probability is not None:
+        _predictions.move_to_end(key)
+        return probability
+
+    probability = np.asarray(predict_proba(trained_model, boundary_array))
+    probability.flags.writeable = False
+    _predictions[key] = probability
+    while len(_predictions) > PREDICTION_CACHE_SIZE:
+        _predictions.popitem(last=False)
+
+    return probability
+
+
+def clear_prediction_cache():
+    """ Removes every prediction cached by predict_boundary. """
+    _predictions.clear()
+
+
+def _get_weights_fingerprint(trained_model):
+    # The id tells apart models of different architectures with the same weights.
+    digest = hashlib.sha1(repr((type(trained_model).__name__, id(trained_model))).encode())
+    for weights in trained_model.get_weights():
+        weights = np.ascontiguousarray(weights)
+        digest.update(repr((weights.dtype.str, weights.shape)).encode())
+        digest.update(weights.data)
+    return digest.hexdigest()
+
+
+def get_node_decision_boundaries(trained_model, discretize=False, density=DENSITY, input_ids=None, batch_size=1024):
+    """
+    Returns the decision boundary of every node (neuron) of every layer of a trained model,
+    with one forward pass of the grid through the model.
+    With a Keras model, the pass is made by a model whose outputs are the outputs of the layers with weights
+    (Dense), numbered as the layers of the playground: InputLayer, Dropout, Flatten... are not layers here,
+    and an Activation or BatchNormalization layer after a Dense layer gives the output of its nodes.
+    A model with a `predict_layers(x)` method returning the list of the outputs of its layers is used as it is.
+
+    :param trained_model: a trained Keras model, or a model with `predict_layers`
+    :param discretize: -1 or 1 instead of the values
+    :param density: number of rows and columns of the grid (default: DENSITY)
+    :param input_ids: list of InputType ids the trained_model takes as its inputs (default: x and y)
+    :param batch_size: batch size of the Keras forward pass
+    :return: a dict of (density, density) matrices keyed by (LayerType, NeuronType) ids,
+        e.g. boundaries[(LayerType.L1, NeuronType.N2)], numbered from 1 in the order of the layers.
+    """
+    boundary_array = Player.get_boundary_array(density=density, input_ids=input_ids)
+
+    if hasattr(trained_model, 'predict_layers'):
+        outputs = trained_model.predict_layers(boundary_array)
+    else:
+        outputs = _get_layers_model(trained_model).predict(boundary_array, batch_size=batch_size, verbose=0)
+        if not isinstance(outputs, (list, tuple)):
+            outputs = [outputs]
+
+    boundaries = {}
+    for layer_index, output in enumerate(outputs, 1):
+        output = np.asarray(output).reshape(len(boundary_array), -1)
+        matrices = Player.get_decision_boundary_of_node(output, discretize, density)
+        if matrices.ndim == 2:
+            matrices = matrices[np.newaxis]
+        for neuron_index, matrix in enumerate(matrices, 1):
+            boundaries[(str(layer_index), str(neuron_index))] = matrix
+
+    return boundaries
+
+
+def _get_layers_model(trained_model):
+    # Keras is not a requirement of this package, so it is imported only when it is used.
+    try:
+        from tensorflow import keras
+    except ImportError:
+        import keras
+    return keras.Model(inputs=trained_model.inputs, outputs=_get_node_layer_outputs(trained_model))
+
+
+def _get_node_layer_outputs(trained_model):
+    # The layers of the playground are the layers with weights (Dense). The other layers (InputLayer,
+    # Dropout, Flatten, BatchNormalization, Activation...) are not numbered, but the output of a node is
+    # the output of the last layer after its Dense layer (before the next one) with the same shape.
+    outputs = []
+    for layer in trained_model.layers:
+        if hasattr(layer, 'kernel'):
+            outputs.append(layer.output)
+        elif outputs and tuple(layer.output.shape) == tuple(outputs[-1].shape):
+            outputs[-1] = layer.output
+    return outputs
@@ -0,0 +1,140 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import threading
+import numpy as np
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+class BatchLoader:
+    '''
+     Iterates over shuffled (X, y) minibatches, e.g. of the output of split_data.
+     Each epoch shuffles a permutation index, not the arrays, so X and y are never copied
+     (they can also be memory-mapped shards). The next batches are gathered on a background thread.
+
+     With Keras, pass its iterator (a generator), since BatchLoader itself is an iterable, not an iterator:
+         loader = BatchLoader(X_train, y_train, batch_size=32)
+         model.fit(iter(loader), steps_per_epoch=len(loader), epochs=10)
+    '''
+
+    def __init__(self, X, y, batch_size=32, shuffle=True, epochs=None, prefetch=2, seed=None):
+        '''
+        :param X: input data (n, ...)
+        :param y: teacher labels (n, ...)
+        :param batch_size: number of rows of each batch (the last batch of an epoch may be shorter)
+        :param shuffle: reshuffle the rows every epoch
+        :param epochs: number of epochs to iterate over (default: forever, as Keras expects from a generator)
+        :param prefetch: number of batches prepared ahead by the background thread (0: no thread)
+        :param seed: seed of the shuffles
+        '''
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same length.")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.epochs = epochs
+        self.prefetch = prefetch
+        self.seed = seed
+
+
+    def __len__(self):
+        ''' Number of batches of each epoch. '''
+        return (len(self.X) + self.batch_size - 1) // self.batch_size
+
+
+    def __iter__(self):
+        '''
+        :return: a generator of the (X, y) batches, e.g. for the generator input of Keras fit
+        '''
+        if self.prefetch <= 0:
+            return self.iter_batches()
+        return _prefetch(self.iter_batches(), self.prefetch)
+
+
+    def iter_batches(self):
+        '''
+        Iterates over the batches on the calling thread.
+        '''
+        rng = np.random.default_rng(self.seed)
+        length = len(self.X)
+        epoch = 0
+        while self.epochs is None or epoch < self.epochs:
+            order = rng.permutation(length) if self.shuffle else None
+            for start in range(0, length, self.batch_size):
+                stop = min(start + self.batch_size, length)
+                if order is None:
+                    yield self.X[start:stop], self.y[start:stop]
+                else:
+                    index = order[start:stop]
+                    yield self.X[index], self.y[index]
+            epoch += 1
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+_END = object()
+
+
+def _prefetch(iterator, size):
+    buffer = queue.Queue(maxsize=size)
+    stopped = threading.Event()
+
+    def put(item):
+        # Gives up when the consumer has stopped, so that the thread never blocks forever.
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_END)
+        except Exception as e:
+            put(_Failure(e))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
@@ -18,15 +18,35 @@
 
 from __future__ import division
 
+import os
 import random
 import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from plygdata.scalelinear import ScaleLinear
-from plygdata.state import DatasetType
+from plygdata.state import DatasetType, BackendType
 
 
 NUM_SAMPLES_CLASSIFY = 500
 NUM_SAMPLES_REGRESS = 1200
 
+# The NumPy backend draws its random numbers block by block, each block of rows from its own
+# stream spawned from the seed. So any range of rows can be reproduced on its own.
+SEED_BLOCK_SIZE = 65536
+
+# The Gaussians of the regress_gaussian dataset: [cx, cy, sign] rows.
+REGRESS_GAUSSIANS = [
+    [-4.0,  2.5,  1.0],
+    [ 0.0,  2.5, -1.0],
+    [ 4.0,  2.5,  1.0],
+    [-4.0, -2.5, -1.0],
+    [ 0.0, -2.5,  1.0],
+    [ 4.0, -2.5, -1.0]
+]
+
+# gaussian_label scores at most this many (point, Gaussian) pairs at a time.
+GAUSSIAN_LABEL_BLOCK_SIZE = 1 << 20
+
 
 #class Example2D:
 #    """
@@ -50,6 +70,58 @@ def rand_uniform(a, b):
     return random.random() * (b - a) + a
 
 
+def _scale_uniform(u, a, b):
+    # Maps uniform [0, 1) draws to [a, b) in the same way as rand_uniform.
+    return u * (b - a) + a
+
+
+def rand_uniform_batch(a, b, size = None, rng = None):
+    """
+    Returns samples from a uniform [a, b] distribution, as an ndarray.
+
+    :param a, b: bounds (scalars or arrays broadcastable to size)
+    :param size: shape of the samples
+    :param rng: None, an int seed or a numpy.random.Generator
+    """
+    return _scale_uniform(np.random.default_rng(rng).random(size), a, b)
+
+
+def normal_random_batch(mean = 0.0, variance = 1.0, size = None, rng = None):
+    """
+        Samples from a normal distribution with the polar method of normal_random,
+        vectorized: the pairs (v1, v2) are drawn as arrays, rejected as arrays, and
+        both v1 and v2 of an accepted pair are used.
+
+        :param mean
+            The mean (a scalar or an array broadcastable to size). Default is 0.0.
+        :param variance
+            The variance (a scalar or an array broadcastable to size). Default is 1.0.
+        :param size
+            Shape of the samples. Default is None (a single float).
+        :param rng
+            None, an int seed or a numpy.random.Generator.
+    """
+    rng = np.random.default_rng(rng)
+    count = int(np.prod(size)) if size is not None else 1
+
+    result = np.empty(count)
+    filled = 0
+    while filled < count:
+        # pi / 4 of the pairs are accepted, and each of them gives two samples.
+        pairs = int((count - filled) / 2 / (math.pi / 4) * 1.05) + 8
+        v = 2.0 * rng.random((pairs, 2)) - 1.0
+        s = v[:, 0] * v[:, 0] + v[:, 1] * v[:, 1]
+        accepted = (s <= 1.0) & (s > 0.0)
+        v = v[accepted]
+        s = s[accepted, np.newaxis]
+        samples = (np.sqrt(-2.0 * np.log(s) / s) * v).ravel()[:count - filled]
+        result[filled:filled + len(samples)] = samples
+        filled += len(samples)
+
+    samples = result[0] if size is None else result.reshape(size)
+    return mean + np.sqrt(variance) * samples
+
+
 def normal_random(mean = 0.0, variance = 1.0):
     """
         Samples from a normal distribution.
@@ -98,26 +170,248 @@ def shuffle(array):
         array[index] = temp
 
 
-def generate_data(data_type, noise = 0.0):
+def get_seed_sequence(seed=None):
+    """
+    Returns a numpy.random.SeedSequence for the seed.
+
+    :param seed: None (fresh entropy), an int seed or a numpy.random.SeedSequence (which is returned as it is).
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def _spawn(root, *key):
+    return np.random.SeedSequence(root.entropy, spawn_key=tuple(root.spawn_key) + key, pool_size=root.pool_size)
+
+
+def get_num_samples(data_type, num_samples = None):
+    """
+    Returns the number of samples to generate for the dataset type.
+    The default is NUM_SAMPLES_CLASSIFY or NUM_SAMPLES_REGRESS.
+    """
+    if num_samples is not None:
+        return int(num_samples)
+    if data_type in (DatasetType.RegressPlane, DatasetType.RegressGaussian):
+        return NUM_SAMPLES_REGRESS
+    return NUM_SAMPLES_CLASSIFY
+
+
+def get_points_dtype(data_type = None, feature_dtype = np.float32, label_dtype = None):
+    """
+    Returns a structured dtype of the points with 'x', 'y' and 'label' fields.
+    With the defaults, a classification point takes 9 bytes (float32 x, y and int8 label)
+    and a regression point 12 bytes, instead of 24 bytes of a float64 row.
+
+    :param data_type: one of DatasetType, to choose the default label_dtype
+    :param feature_dtype: dtype of x and y
+    :param label_dtype: dtype of the label (default: int8 for the classification datasets, feature_dtype otherwise)
+    """
+    if label_dtype is None:
+        if data_type in (DatasetType.RegressPlane, DatasetType.RegressGaussian):
+            label_dtype = feature_dtype
+        else:
+            label_dtype = np.int8
+    return np.dtype([('x', feature_dtype), ('y', feature_dtype), ('label', label_dtype)])
+
+
+def as_points(data, dtype):
+    """
+    Converts (n, 3) data to the dtype.
+
+    :param data: (n, 3) data, e.g. the output of generate_data
+    :param dtype: a plain dtype for a (n, 3) ndarray, or a structured dtype of three fields (see get_points_dtype)
+        for a (n,) record array.
+    """
+    data = np.asarray(data)
+    return _stack_points(data[..., 0], data[..., 1], data[..., 2], dtype)
+
+
+def generate_data(data_type, noise = 0.0, backend = BackendType.Python, seed = None, num_samples = None, dtype = None):
+    """
+    Generates the data of the given dataset type.
+
+    :param data_type: one of DatasetType
+    :param noise: noise level (0.0 - 0.5)
+    :param backend: BackendType.Python returns a list of [x, y, label] lists drawn from the `random` module.
+        BackendType.NumPy returns a (n, 3) ndarray built with whole-array operations.
+    :param seed: the seed of the NumPy backend (see get_seed_sequence). Ignored by the Python backend.
+    :param num_samples: number of samples (default: NUM_SAMPLES_CLASSIFY or NUM_SAMPLES_REGRESS)
+    :param dtype: None, or the dtype of a ndarray to return (see as_points).
+        The NumPy backend builds it directly, without a float64 copy of the data.
+    :return: the data, or None if the data_type is unknown.
+    """
+
+    if backend == BackendType.Python:
+        generator = DataGenerator
+        options = {}
+    elif backend == BackendType.NumPy:
+        generator = NumpyDataGenerator
+        options = {'rng': seed, 'dtype': dtype}
+    else:
+        raise ValueError("Unknown backend: {}".format(backend))
+
+    numSamples = get_num_samples(data_type, num_samples)
 
     if data_type == DatasetType.ClassifyTwoGaussData:
-        data_array = DataGenerator.classify_two_gauss(NUM_SAMPLES_CLASSIFY, noise=noise)
+        data_array = generator.classify_two_gauss(numSamples, noise=noise, **options)
     elif data_type == DatasetType.ClassifyXORData:
-        data_array = DataGenerator.classify_xor(NUM_SAMPLES_CLASSIFY, noise=noise)
+        data_array = generator.classify_xor(numSamples, noise=noise, **options)
     elif data_type == DatasetType.ClassifyCircleData:
-        data_array = DataGenerator.classify_circle(NUM_SAMPLES_CLASSIFY, noise=noise)
+        data_array = generator.classify_circle(numSamples, noise=noise, **options)
     elif data_type == DatasetType.ClassifySpiralData:
-        data_array = DataGenerator.classify_spiral(NUM_SAMPLES_CLASSIFY, noise=noise)
+        data_array = generator.classify_spiral(numSamples, noise=noise, **options)
     elif data_type == DatasetType.RegressPlane:
-        data_array = DataGenerator.regress_plane(NUM_SAMPLES_REGRESS, noise=noise)
+        data_array = generator.regress_plane(numSamples, noise=noise, **options)
     elif data_type == DatasetType.RegressGaussian:
-        data_array = DataGenerator.regress_gaussian(NUM_SAMPLES_REGRESS, noise=noise)
+        data_array = generator.regress_gaussian(numSamples, noise=noise, **options)
     else:
         return None
 
+    if dtype is not None and backend == BackendType.Python:
+        data_array = as_points(data_array, dtype)
+
     return data_array
 
 
+def generate_data_batch(configs, num_samples = None, dtype = None):
+    """
+    Generates many datasets in one call with the NumPy backend.
+    The draws of each dataset come from its own seed, and the datasets of the same type are built
+    in a single vectorized pass, so generate_data_batch(configs)[i] equals
+    generate_data(*configs[i], backend=BackendType.NumPy).
+
+    :param configs: sequence of (data_type, noise) or (data_type, noise, seed) tuples
+    :param num_samples: number of samples of every dataset (default: see get_num_samples)
+    :param dtype: None, or the dtype of the ndarray (see as_points)
+    :return: a (k, n, 3) ndarray, or a (k, n) record array
+    """
+    configs = [tuple(config) + (None,) * (3 - len(config)) for config in configs]
+    if len(configs) == 0:
+        raise ValueError("No configs error.")
+
+    groups = {}
+    for index, (data_type, noise, seed) in enumerate(configs):
+        if data_type not in _NUMPY_BUILDERS:
+            raise ValueError("Unknown data_type: {}".format(data_type))
+        groups.setdefault(data_type, []).append(index)
+
+    result = None
+    for data_type, indices in groups.items():
+        numSamples = get_num_samples(data_type, num_samples)
+        u = np.stack([NumpyDataGenerator.draw(data_type, numSamples, configs[i][2]) for i in indices])
+        noise = np.array([configs[i][1] for i in indices], dtype=float)[:, np.newaxis]
+        points = NumpyDataGenerator.build(data_type, u, noise, numSamples=numSamples, dtype=dtype)
+
+        if result is None:
+            result = np.empty((len(configs),) + points.shape[1:], points.dtype)
+        elif result.shape[1:] != points.shape[1:]:
+            raise ValueError("All the datasets must have the same number of samples. Pass num_samples.")
+        result[indices] = points
+
+    return result
+
+
+def generate_data_chunks(data_type, noise = 0.0, chunk_size = SEED_BLOCK_SIZE, num_samples = None, seed = None, dtype = None):
+    """
+    Generates the data of the given dataset type with the NumPy backend, chunk by chunk.
+    Only one chunk (plus one block of draws, see SEED_BLOCK_SIZE) is held in memory at a time,
+    and the concatenated chunks equal generate_data(data_type, noise, BackendType.NumPy, seed, num_samples)
+    whatever the chunk_size is.
+
+    :param data_type: one of DatasetType
+    :param noise: noise level (0.0 - 0.5)
+    :param chunk_size: number of rows of each chunk (the last one may be shorter)
+    :param num_samples: number of samples (default: see get_num_samples)
+    :param seed: None, an int seed or a numpy.random.SeedSequence. Pass a seed to reproduce the data.
+    :param dtype: None, or the dtype of the chunks (see as_points)
+    :return: an iterator of (chunk_size, 3) ndarrays, or (chunk_size,) record arrays
+    """
+    if data_type not in _NUMPY_BUILDERS:
+        raise ValueError("Unknown data_type: {}".format(data_type))
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+
+    numSamples = get_num_samples(data_type, num_samples)
+    root = get_seed_sequence(seed)
+    rows = _get_num_rows(data_type, numSamples)
+
+    # Get the seed now, not at the first next(), so a seed of None is fixed at the call.
+    return _iter_chunks(data_type, noise, chunk_size, numSamples, root, rows, dtype)
+
+
+def generate_data_sharded(data_type, noise = 0.0, num_samples = None, seed = None, num_workers = None, dtype = None):
+    """
+    Generates the data of the given dataset type with the NumPy backend, split into shards
+    that are generated on a process pool.
+    Each shard draws from its own streams spawned from the seed (see SEED_BLOCK_SIZE), so the result
+    equals generate_data(data_type, noise, BackendType.NumPy, seed, num_samples) whatever num_workers is.
+
+    :param data_type: one of DatasetType
+    :param noise: noise level (0.0 - 0.5)
+    :param num_samples: number of samples (default: see get_num_samples)
+    :param seed: None, an int seed or a numpy.random.SeedSequence. Pass a seed to reproduce the data.
+    :param num_workers: number of processes (default: the number of CPUs). 1 generates in this process.
+    :param dtype: None, or the dtype of the ndarray (see as_points)
+    :return: a (n, 3) ndarray, or a (n,) record array
+    """
+    if data_type not in _NUMPY_BUILDERS:
+        raise ValueError("Unknown data_type: {}".format(data_type))
+
+    numSamples = get_num_samples(data_type, num_samples)
+    root = get_seed_sequence(seed)
+    rows = _get_num_rows(data_type, numSamples)
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if num_workers <= 1:
+        return _generate_shard(data_type, noise, numSamples, root, 0, rows, dtype)
+
+    # Shards are whole blocks, so no block is drawn twice.
+    blocks = (rows + SEED_BLOCK_SIZE - 1) // SEED_BLOCK_SIZE
+    shardSize = max(1, (blocks + num_workers - 1) // num_workers) * SEED_BLOCK_SIZE
+
+    result = None
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {}
+        for start in range(0, rows, shardSize):
+            stop = min(start + shardSize, rows)
+            futures[start] = executor.submit(_generate_shard, data_type, noise, numSamples, root, start, stop, dtype)
+        for start, future in futures.items():
+            shard = future.result()
+            if result is None:
+                result = np.empty((rows,) + shard.shape[1:], shard.dtype)
+            result[start:start + len(shard)] = shard
+
+    return result
+
+
+def _generate_shard(data_type, noise, numSamples, root, start, stop, dtype):
+    u = NumpyDataGenerator.draw(data_type, numSamples, root, start, stop)
+    return NumpyDataGenerator.build(data_type, u, noise, start, numSamples, dtype)
+
+
+def _iter_chunks(data_type, noise, chunk_size, numSamples, root, rows, dtype):
+    pending = []
+    pendingRows = 0
+    start = 0
+    for _, u in _iter_draw_blocks(data_type, root, 0, rows):
+        offset = 0
+        while offset < len(u):
+            take = min(chunk_size - pendingRows, len(u) - offset)
+            pending.append(u[offset:offset + take])
+            pendingRows += take
+            offset += take
+            if pendingRows == chunk_size:
+                yield NumpyDataGenerator.build(data_type, np.concatenate(pending), noise, start, numSamples, dtype)
+                start += pendingRows
+                pending = []
+                pendingRows = 0
+
+    if pendingRows > 0:
+        yield NumpyDataGenerator.build(data_type, np.concatenate(pending), noise, start, numSamples, dtype)
+
+
 class DataGenerator:
 
     @staticmethod
@@ -229,19 +523,13 @@ class DataGenerator:
 
 
     @staticmethod
-    def regress_gaussian(numSamples, noise = 0.0):
+    def regress_gaussian(numSamples, noise = 0.0, gaussians = None):
         points = []
         
         labelScale = ScaleLinear(domain=[0.0, 2.0], slrange=[1.0, 0.0], clamp=True)
         
-        gaussians = [
-            [-4.0,  2.5,  1.0],
-            [ 0.0,  2.5, -1.0],
-            [ 4.0,  2.5,  1.0],
-            [-4.0, -2.5, -1.0],
-            [ 0.0, -2.5,  1.0],
-            [ 4.0, -2.5, -1.0]
-        ]
+        if gaussians is None:
+            gaussians = REGRESS_GAUSSIANS
         
         def getLabel(x, y):
         # Choose the one that is maximum in abs value.
@@ -266,3 +554,371 @@ class DataGenerator:
         
         return points
 
+
+def _stack_points(x, y, label, dtype = None):
+    x, y, label = np.broadcast_arrays(x, y, label)
+    dtype = np.dtype(float if dtype is None else dtype)
+    if dtype.names is None:
+        points = np.empty(x.shape + (3,), dtype)
+        points[..., 0] = x
+        points[..., 1] = y
+        points[..., 2] = label
+    else:
+        points = np.empty(x.shape, dtype)
+        for name, values in zip(dtype.names, (x, y, label)):
+            points[name] = values
+    return points
+
+
+# The builders below turn the random draws `u` of shape (..., rows, columns) into the
+# x, y and label arrays of shape (..., rows). Leading dimensions are batches of datasets; `noise` is a scalar or
+# an array broadcastable to u[..., 0] (e.g. shape (k, 1) for a batch of k datasets).
+# `index` holds the row numbers of u in the whole dataset of numSamples samples, since the
+# classification datasets put the positive half first and the negative half next.
+
+def _build_two_gauss(u, noise, index, numSamples):
+    # u: standard normal draws of x and y.
+    positive = index < numSamples // 2
+    varianceScale = ScaleLinear(domain=[0.0, 0.5], slrange=[0.5, 4.0])
+    stddev = np.sqrt(varianceScale(np.asarray(noise, dtype=float)))
+
+    # Gaussian with positive examples, then Gaussian with negative examples.
+    center = np.where(positive, 2.0, -2.0)
+    label = np.where(positive, 1, -1)
+    x = center + stddev * u[..., 0]
+    y = center + stddev * u[..., 1]
+    return x, y, label
+
+
+def _build_xor(u, noise, index, numSamples):
+    # u: uniform draws of x, y, noiseX and noiseY.
+    padding = 0.3
+    x = _scale_uniform(u[..., 0], -5.0, 5.0)
+    x = np.where(x > 0, x + padding, x - padding)  # Padding.
+    y = _scale_uniform(u[..., 1], -5.0, 5.0)
+    y = np.where(y > 0, y + padding, y - padding)
+    noiseX = _scale_uniform(u[..., 2], -5.0, 5.0) * noise
+    noiseY = _scale_uniform(u[..., 3], -5.0, 5.0) * noise
+    label = _xor_label(x + noiseX, y + noiseY)
+    return x, y, label
+
+
+def _xor_label(px, py):
+    return np.where(px * py >= 0, 1, -1)
+
+
+def _build_circle(u, noise, index, numSamples):
+    # u: uniform draws of r, angle, noiseX and noiseY.
+    positive = index < numSamples // 2
+    radius = 5.0
+
+    # Positive points inside the circle, then negative points outside the circle.
+    rLow = np.where(positive, 0.0, radius * 0.7)
+    rHigh = np.where(positive, radius * 0.5, radius)
+
+    r = _scale_uniform(u[..., 0], rLow, rHigh)
+    angle = _scale_uniform(u[..., 1], 0.0, 2.0 * math.pi)
+    x = r * np.sin(angle)
+    y = r * np.cos(angle)
+    noiseX = _scale_uniform(u[..., 2], -radius, radius) * noise
+    noiseY = _scale_uniform(u[..., 3], -radius, radius) * noise
+    label = _circle_label(x + noiseX, y + noiseY)
+    return x, y, label
+
+
+def _circle_label(px, py):
+    radius = 5.0
+    return np.where(np.hypot(px, py) < (radius * 0.5), 1, -1)
+
+
+def _build_spiral(u, noise, index, numSamples):
+    # u: uniform draws of the jitter of x and y.
+    n = numSamples // 2
+    positive = index < n
+
+    # Positive examples, then negative examples.
+    i = np.where(positive, index, index - n)
+    deltaT = np.where(positive, 0.0, math.pi)
+    label = np.where(positive, 1, -1)
+
+    r = i / n * 5
+    t = 1.75 * i / n * 2 * math.pi + deltaT
+    x = r * np.sin(t) + _scale_uniform(u[..., 0], -1.0, 1.0) * noise
+    y = r * np.cos(t) + _scale_uniform(u[..., 1], -1.0, 1.0) * noise
+    return x, y, label
+
+
+def _build_plane(u, noise, index, numSamples):
+    # u: uniform draws of x, y, noiseX and noiseY.
+    radius = 6
+
+    x = _scale_uniform(u[..., 0], -radius, radius)
+    y = _scale_uniform(u[..., 1], -radius, radius)
+    noiseX = _scale_uniform(u[..., 2], -radius, radius) * noise
+    noiseY = _scale_uniform(u[..., 3], -radius, radius) * noise
+    label = _plane_label(x + noiseX, y + noiseY)
+    return x, y, label
+
+
+def _plane_label(px, py):
+    labelScale = ScaleLinear(domain=[-10, 10], slrange=[-1, 1])
+    return labelScale(px + py)
+
+
+def gaussian_label(x, y, gaussians = None):
+    """
+    Returns the labels of the regress_gaussian dataset at the points (x, y).
+    All the points are scored against all the Gaussians in one broadcast operation,
+    and the score that is maximum in abs value is chosen for each point.
+
+    :param x, y: coordinates (arrays of the same shape)
+    :param gaussians: (k, 3) table of [cx, cy, sign] rows (default: REGRESS_GAUSSIANS)
+    :return: an ndarray of the labels, of the shape of x
+    """
+    gaussians = np.asarray(REGRESS_GAUSSIANS if gaussians is None else gaussians, dtype=float)
+    x, y = np.broadcast_arrays(x, y)
+    flatX = x.ravel()
+    flatY = y.ravel()
+
+    # ScaleLinear only clamps scalars, so the clamp is applied with np.clip.
+    labelScale = ScaleLinear(domain=[0.0, 2.0], slrange=[1.0, 0.0])
+
+    label = np.empty(len(flatX))
+    step = max(1, GAUSSIAN_LABEL_BLOCK_SIZE // max(1, len(gaussians)))
+    for start in range(0, len(flatX), step):
+        px = flatX[start:start + step, np.newaxis]
+        py = flatY[start:start + step, np.newaxis]
+        dx = px - gaussians[:, 0]
+        dy = py - gaussians[:, 1]
+        scores = gaussians[:, 2] * np.clip(labelScale(np.sqrt(dx * dx + dy * dy)), 0.0, 1.0)
+        best = np.argmax(np.abs(scores), axis=1)
+        # `+ 0.0` turns the -0.0 of the points far from every Gaussian into 0.0.
+        label[start:start + step] = scores[np.arange(len(best)), best] + 0.0
+
+    return label.reshape(x.shape)
+
+
+def _build_gaussian(u, noise, index, numSamples, gaussians = None):
+    # u: uniform draws of x, y, noiseX and noiseY.
+    radius = 6.0
+
+    x = _scale_uniform(u[..., 0], -radius, radius)
+    y = _scale_uniform(u[..., 1], -radius, radius)
+    px = x + _scale_uniform(u[..., 2], -radius, radius) * noise
+    py = y + _scale_uniform(u[..., 3], -radius, radius) * noise
+    label = gaussian_label(px, py, gaussians)
+
+    return x, y, label
+
+
+# Per dataset type: (builder, sampler of the draws, draws per point, generated as two halves).
+_NUMPY_BUILDERS = {
+    DatasetType.ClassifyTwoGaussData: (_build_two_gauss, 'standard_normal', 2, True),
+    DatasetType.ClassifyXORData: (_build_xor, 'random', 4, False),
+    DatasetType.ClassifyCircleData: (_build_circle, 'random', 4, True),
+    DatasetType.ClassifySpiralData: (_build_spiral, 'random', 2, True),
+    DatasetType.RegressPlane: (_build_plane, 'random', 4, False),
+    DatasetType.RegressGaussian: (_build_gaussian, 'random', 4, False),
+}
+
+
+# Per dataset type with a noise term: (half-width of its uniform draws, label function of the
+# noisy points). The noise of the spiral jitters the points themselves, so it has no label function.
+_NOISE_TERMS = {
+    DatasetType.ClassifyXORData: (5.0, _xor_label),
+    DatasetType.ClassifyCircleData: (5.0, _circle_label),
+    DatasetType.ClassifySpiralData: (1.0, None),
+    DatasetType.RegressPlane: (6.0, _plane_label),
+    DatasetType.RegressGaussian: (6.0, gaussian_label),
+}
+
+# Spawn key of the noise streams of NoiseResampler, apart from the block streams.
+_NOISE_SPAWN_KEY = 1 << 31
+
+
+def _get_num_rows(data_type, numSamples):
+    # Classification datasets are made of two halves, so an odd number is rounded down.
+    halves = _NUMPY_BUILDERS[data_type][3]
+    return numSamples // 2 * 2 if halves else numSamples
+
+
+def _iter_draw_blocks(data_type, root, start, stop):
+    # Yields (row number, draws) of the rows [start, stop), block by block.
+    _, sampler, columns, _ = _NUMPY_BUILDERS[data_type]
+    for block in range(start // SEED_BLOCK_SIZE, (stop + SEED_BLOCK_SIZE - 1) // SEED_BLOCK_SIZE):
+        blockStart = block * SEED_BLOCK_SIZE
+        rng = np.random.default_rng(_spawn(root, block))
+        u = getattr(rng, sampler)((min(SEED_BLOCK_SIZE, stop - blockStart), columns))
+        first = max(start - blockStart, 0)
+        yield blockStart + first, u[first:]
+
+
+class NumpyDataGenerator:
+    """
+    Vectorized version of DataGenerator.
+    The geometry and the label rules are the same, but every dataset is built with whole-array
+    operations and returned as a (numSamples, 3) ndarray of [x, y, label] rows.
+    Each dataset is made in two steps: `draw` takes all the random numbers at once,
+    and `build` turns them into points, which also works on a stack of draws.
+    The `rng` of the methods is either a seed (None, an int or a numpy.random.SeedSequence),
+    whose draws are reproducible for any range of rows (see SEED_BLOCK_SIZE),
+    or a numpy.random.Generator, which is drawn from in order.
+    """
+
+    @staticmethod
+    def draw(data_type, numSamples, rng = None, start = 0, stop = None):
+        """
+        Draws the random numbers of a dataset.
+
+        :param data_type: one of DatasetType
+        :param numSamples: number of samples. Classification datasets are made of two halves,
+            so an odd number is rounded down.
+        :param rng: seed or generator
+        :param start: first row to draw
+        :param stop: end of the rows to draw (default: all the rows)
+        :return: a (stop - start, columns) ndarray with the draws of one point per row
+        """
+        _, sampler, columns, _ = _NUMPY_BUILDERS[data_type]
+        rows = _get_num_rows(data_type, numSamples)
+        stop = rows if stop is None else min(stop, rows)
+
+        if isinstance(rng, np.random.Generator):
+            return getattr(rng, sampler)((max(stop - start, 0), columns))
+
+        u = np.empty((max(stop - start, 0), columns))
+        for row, block in _iter_draw_blocks(data_type, get_seed_sequence(rng), start, stop):
+            u[row - start:row - start + len(block)] = block
+        return u
+
+
+    @staticmethod
+    def build(data_type, u, noise = 0.0, start = 0, numSamples = None, dtype = None):
+        """
+        Builds the points of a dataset from its draws.
+
+        :param data_type: one of DatasetType
+        :param u: draws of shape (..., rows, columns) returned by `draw` (stacked for a batch)
+        :param noise: noise level, or an array broadcastable to u[..., 0]
+        :param start: row number of the first row of u in the dataset
+        :param numSamples: number of samples of the whole dataset (default: the rows of u)
+        :param dtype: None, or the dtype of the ndarray (see as_points)
+        :return: a (..., rows, 3) ndarray, or a (..., rows) record array
+        """
+        if numSamples is None:
+            numSamples = start + u.shape[-2]
+        index = start + np.arange(u.shape[-2])
+        x, y, label = _NUMPY_BUILDERS[data_type][0](u, noise, index, numSamples)
+        return _stack_points(x, y, label, dtype)
+
+
+    @staticmethod
+    def classify_two_gauss(numSamples, noise = 0.0, rng = None, dtype = None):
+        return NumpyDataGenerator._generate(DatasetType.ClassifyTwoGaussData, numSamples, noise, rng, dtype)
+
+
+    @staticmethod
+    def classify_xor(numSamples, noise = 0.0, rng = None, dtype = None):
+        return NumpyDataGenerator._generate(DatasetType.ClassifyXORData, numSamples, noise, rng, dtype)
+
+
+    @staticmethod
+    def classify_circle(numSamples, noise = 0.0, rng = None, dtype = None):
+        return NumpyDataGenerator._generate(DatasetType.ClassifyCircleData, numSamples, noise, rng, dtype)
+
+
+    @staticmethod
+    def classify_spiral(numSamples, noise = 0.0, rng = None, dtype = None):
+        return NumpyDataGenerator._generate(DatasetType.ClassifySpiralData, numSamples, noise, rng, dtype)
+
+
+    @staticmethod
+    def regress_plane(numSamples, noise = 0.0, rng = None, dtype = None):
+        return NumpyDataGenerator._generate(DatasetType.RegressPlane, numSamples, noise, rng, dtype)
+
+
+    @staticmethod
+    def regress_gaussian(numSamples, noise = 0.0, rng = None, dtype = None, gaussians = None):
+        """
+        :param gaussians: (k, 3) table of [cx, cy, sign] rows (default: REGRESS_GAUSSIANS)
+        """
+        u = NumpyDataGenerator.draw(DatasetType.RegressGaussian, numSamples, rng)
+        x, y, label = _build_gaussian(u, noise, None, numSamples, gaussians)
+        return _stack_points(x, y, label, dtype)
+
+
+    @staticmethod
+    def _generate(data_type, numSamples, noise, rng, dtype):
+        u = NumpyDataGenerator.draw(data_type, numSamples, rng)
+        return NumpyDataGenerator.build(data_type, u, noise, numSamples=numSamples, dtype=dtype)
+
+
+class NoiseResampler:
+    """
+    Keeps the clean coordinates of a NumPy-backend dataset and redraws only its noise term,
+    e.g. to augment the data every epoch without regenerating it.
+    The noise term is noiseX/noiseY of the xor, circle, plane and gaussian datasets (the labels are
+    re-evaluated on the noisy points), or the jitter of the points of the spiral dataset.
+    The two gauss dataset has no noise term (its noise is the variance), so it is not supported.
+    """
+
+    def __init__(self, data_type, noise = 0.0, num_samples = None, seed = None):
+        """
+        :param data_type: one of DatasetType except ClassifyTwoGaussData
+        :param noise: noise level (0.0 - 0.5)
+        :param num_samples: number of samples (default: see get_num_samples)
+        :param seed: None, an int seed or a numpy.random.SeedSequence, of the clean data and of the noise
+        """
+        if data_type not in _NOISE_TERMS:
+            raise ValueError("The dataset has no noise term to resample: {}".format(data_type))
+
+        self.data_type = data_type
+        self.noise = noise
+        self.numSamples = get_num_samples(data_type, num_samples)
+        self.epoch = 0
+        self._root = get_seed_sequence(seed)
+
+        u = NumpyDataGenerator.draw(data_type, self.numSamples, self._root)
+        clean = NumpyDataGenerator.build(data_type, u, 0.0, numSamples=self.numSamples)
+        self.x = clean[:, 0].copy()
+        self.y = clean[:, 1].copy()
+        self.label = clean[:, 2].copy()
+
+        # Buffers reused by every resample().
+        self.points = clean
+        self._noise = np.empty((2, len(clean)))
+
+
+    def resample(self, epoch = None, out = None):
+        """
+        Redraws the noise term and re-evaluates the labels in place.
+
+        :param epoch: number of the epoch. The noise of each epoch is drawn from its own stream
+            spawned from the seed. Default: the epoch after the last resampled one.
+        :param out: (n, 3) float64 array to write into (default: self.points, overwritten by every call)
+        :return: the (n, 3) points
+        """
+        if epoch is None:
+            epoch = self.epoch
+        self.epoch = epoch + 1
+        if out is None:
+            out = self.points
+
+        width, getLabel = _NOISE_TERMS[self.data_type]
+        rng = np.random.default_rng(_spawn(self._root, _NOISE_SPAWN_KEY, epoch))
+        rng.random(out=self._noise)
+        amplitude = width * self.noise
+        self._noise *= 2.0 * amplitude
+        self._noise -= amplitude
+        self._noise[0] += self.x
+        self._noise[1] += self.y
+        px, py = self._noise
+
+        if getLabel is None:
+            out[:, 0] = px
+            out[:, 1] = py
+            out[:, 2] = self.label
+        else:
+            out[:, 0] = self.x
+            out[:, 1] = self.y
+            out[:, 2] = getLabel(px, py)
+        return out
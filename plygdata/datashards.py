@@ -0,0 +1,184 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import glob
+import json
+import os
+import numpy as np
+from plygdata.dataset import SEED_BLOCK_SIZE
+
+
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+def save_shards(directory, data, data_type=None, noise=None, seed=None, label_num=1, shard_size=SEED_BLOCK_SIZE):
+    '''
+    Saves the output of generate_data as a directory of .npy shards and a manifest.
+
+    :param directory: output directory
+    :param data: (n, columns) data, e.g. the output of generate_data. The shards keep its dtype (e.g. float32).
+    :param data_type: DatasetType written in the manifest
+    :param noise: noise level written in the manifest
+    :param seed: int seed written in the manifest
+    :param label_num: number of label columns at the end of each row
+    :param shard_size: max number of rows of each shard
+    :return: the manifest (dict)
+    '''
+    data = np.asarray(data)
+    return _save(directory, [('data', [data])], data_type, noise, seed, label_num, shard_size, data.dtype)
+
+
+def save_split_shards(directory, X_train, y_train, X_valid, y_valid, data_type=None, noise=None, seed=None, shard_size=SEED_BLOCK_SIZE):
+    '''
+    Saves the output of split_data as a directory of .npy shards and a manifest.
+    Each shard holds the rows [X | y] of the 'train' or the 'valid' split,
+    and the manifest has the boundaries of the splits.
+    The shards have the common dtype of the arrays (np.result_type), e.g. float32 for float32 data.
+
+    :param directory: output directory
+    :param X_train, y_train, X_valid, y_valid: the output of split_data
+    :param data_type, noise, seed, shard_size: see save_shards
+    :return: the manifest (dict)
+    '''
+    y_train = np.reshape(y_train, (len(y_train), -1))
+    y_valid = np.reshape(y_valid, (len(y_valid), -1))
+    label_num = y_train.shape[1]
+    splits = [('train', [X_train, y_train]), ('valid', [X_valid, y_valid])]
+    dtype = np.result_type(*[np.asarray(part) for _, parts in splits for part in parts])
+    return _save(directory, splits, data_type, noise, seed, label_num, shard_size, dtype)
+
+
+def load_shards(directory, mmap_mode='r'):
+    '''
+    Opens a directory written by save_shards or save_split_shards.
+    With the default mmap_mode, the shards are memory-mapped read-only, so every worker opening
+    the same directory shares the pages through the OS instead of holding its own copy.
+
+    :param directory: directory of the shards
+    :param mmap_mode: mmap_mode of np.load (None loads the shards into memory)
+    :return: a ShardedData
+    '''
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError("Unknown format of shards: {}".format(manifest.get('format')))
+    return ShardedData(directory, manifest, mmap_mode)
+
+
+def _save(directory, splits, data_type, noise, seed, label_num, shard_size, dtype):
+    if shard_size <= 0:
+        raise ValueError("shard_size must be positive.")
+    if np.dtype(dtype).names is not None:
+        # The shards are (rows, columns) arrays, sliced into X and y by columns.
+        raise ValueError("Record arrays can't be saved as shards. Convert them to a plain dtype first, "
+                         "e.g. as_points(data, np.float32).")
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    else:
+        # Remove the manifest first, so that the directory is never read as complete
+        # with the old manifest and the new shards, then the shards of the previous save.
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        for path in glob.glob(os.path.join(directory, '*-[0-9][0-9][0-9][0-9][0-9].npy')):
+            os.remove(path)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'data_type': data_type,
+        'noise': None if noise is None else float(noise),
+        'seed': None if seed is None else int(seed),
+        'label_num': int(label_num),
+        'num_samples': 0,
+        'columns': None,
+        'dtype': np.dtype(dtype).str,
+        'splits': {},
+    }
+
+    start = 0
+    for name, parts in splits:
+        rows = len(parts[0])
+        shards = []
+        for shard_start in range(0, rows, shard_size):
+            shard_stop = min(shard_start + shard_size, rows)
+            shard = np.hstack([np.asarray(part[shard_start:shard_stop], dtype=dtype) for part in parts])
+            file_name = '{}-{:05d}.npy'.format(name, len(shards))
+            np.save(os.path.join(directory, file_name), shard)
+            shards.append({'file': file_name, 'start': start + shard_start, 'stop': start + shard_stop})
+            manifest['columns'] = shard.shape[1]
+        manifest['splits'][name] = {'start': start, 'stop': start + rows, 'shards': shards}
+        start += rows
+
+    manifest['num_samples'] = start
+
+    # Write the manifest last, so that a directory with a manifest is complete.
+    with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+class ShardedData:
+    '''
+     Shards opened by load_shards.
+     The rows of the dataset are numbered through all the splits (see manifest['splits']).
+    '''
+
+    def __init__(self, directory, manifest, mmap_mode='r'):
+        self.directory = directory
+        self.manifest = manifest
+        self.mmap_mode = mmap_mode
+        self.label_num = manifest['label_num']
+
+    def __len__(self):
+        return self.manifest['num_samples']
+
+    @property
+    def split_names(self):
+        return sorted(self.manifest['splits'], key=lambda name: self.manifest['splits'][name]['start'])
+
+    def get_shards(self, split=None):
+        '''
+        :param split: name of the split ('data', 'train' or 'valid'). None means every split.
+        :return: the list of (rows, columns) shard arrays
+        '''
+        names = self.split_names if split is None else [split]
+        return [self._load(shard['file']) for name in names for shard in self.manifest['splits'][name]['shards']]
+
+    def get_shard_xy(self, split=None):
+        '''
+        :return: the list of (X, y) views of each shard, with the shapes of split_data.
+        '''
+        return [(shard[:, :-self.label_num], shard[:, -self.label_num:]) for shard in self.get_shards(split)]
+
+    def get_split(self, split):
+        '''
+        Concatenates the shards of one split (this copies the data into memory).
+
+        :return: (X, y) of the split
+        '''
+        shards = self.get_shards(split)
+        if len(shards) == 0:
+            data = np.empty((0, self.manifest['columns'] or (self.label_num + 2)), dtype=self.manifest.get('dtype', float))
+        else:
+            data = np.concatenate(shards)
+        return data[:, :-self.label_num], data[:, -self.label_num:]
+
+    def _load(self, file_name):
+        return np.load(os.path.join(self.directory, file_name), mmap_mode=self.mmap_mode)
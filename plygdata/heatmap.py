@@ -18,8 +18,9 @@
 
 from __future__ import division
 
+import numpy as np
 from plygdata.datacolor import DataColor
-from plygdata.playground import Player
+from plygdata.playground import Player, DENSITY
 
 
 RECT_DOMAIN = [-6.0, 6.0, -6.0, 6.0]
@@ -41,12 +42,12 @@ class HeatMap:
 
 
     @staticmethod
-    def updateBackground(ax, boundaries, node_id, discretize, probability=None):
+    def updateBackground(ax, boundaries, node_id, discretize, probability=None, density=DENSITY):
         if probability is None:
-          boundaries = Player.update_decision_boundary(boundaries, discretize)
+          boundaries = Player.update_decision_boundary(boundaries, discretize, density)
           boundary_of_node = boundaries[node_id]
         else:
-          boundary_of_node = Player.get_decision_boundary_of_node(probability, discretize)
+          boundary_of_node = Player.get_decision_boundary_of_node(probability, discretize, density)
         im = HeatMap.draw_decision_boundary_of_node(ax, boundary_of_node)
         return im
 
@@ -73,37 +74,34 @@ class HeatMap:
 
 
     @staticmethod
-    def reduceMatrix(matrix, factor):
-
-        len_matrix = len(matrix)
-
-        if len_matrix != len(matrix[0]):
-            raise ValueError("The provided matrix must be a square matrix")
-
-        if len_matrix % factor != 0:
-            raise ValueError("The width/height of the matrix must be divisible by the reduction factor")
-
-        result = [None] * (len_matrix / factor)
-
-        try:
-            zrange = xrange
-        except NameError:
-            zrange = range
-
-        for i in zrange(0, len_matrix, factor):
-
-            result[i / factor] = [None] * (matrix.length / factor)
-
-            for j in zrange(0, len_matrix, factor):
-                avg = 0
-
-                # Sum all the values in the neighborhood.
-                for k in range(factor):
-                    for l in range(factor):
-                        avg += matrix[i + k][j + l]
-
-                avg = avg / (factor * factor)
-                result[i / factor][j / factor] = avg
-
-        return result
-
+    def reduceMatrix(matrix, factor, mode='crop'):
+        '''
+        Reduces a matrix by the mean of each factor x factor block, e.g. for thumbnails of a boundary.
+
+        :param matrix: 2-D array (the rows and the columns can differ)
+        :param factor: size of the blocks, an int or (rows, columns)
+        :param mode: how to reduce when the size of the matrix is not divisible by the factor:
+            'crop' drops the last rows/columns which don't fill a block,
+            'pad' keeps them and takes the mean of the partial blocks.
+        :return: the reduced ndarray
+        '''
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.ndim != 2:
+            raise ValueError("The provided matrix must be a 2-D matrix")
+        factor_rows, factor_columns = (factor, factor) if np.isscalar(factor) else factor
+        if factor_rows <= 0 or factor_columns <= 0:
+            raise ValueError("The reduction factor must be positive")
+
+        rows, columns = matrix.shape
+        if mode == 'crop':
+            rows -= rows % factor_rows
+            columns -= columns % factor_columns
+            blocks = matrix[:rows, :columns].reshape(rows // factor_rows, factor_rows, columns // factor_columns, factor_columns)
+            return blocks.mean(axis=(1, 3))
+        if mode == 'pad':
+            row_starts = np.arange(0, rows, factor_rows)
+            column_starts = np.arange(0, columns, factor_columns)
+            sums = np.add.reduceat(np.add.reduceat(matrix, row_starts, axis=0), column_starts, axis=1)
+            counts = np.outer(np.diff(np.append(row_starts, rows)), np.diff(np.append(column_starts, columns)))
+            return sums / counts
+        raise ValueError("Unknown mode: {}".format(mode))
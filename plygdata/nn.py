@@ -0,0 +1,290 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# This is a Python implementation of [tensorflow / playground (Deep playground) / nn.ts](https://github.com/tensorflow/playground/blob/master/src/nn.ts),
+# vectorized with NumPy: each layer is a weight matrix instead of nodes and links.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import numpy as np
+
+
+# Defaults of the playground (state.ts)
+LEARNING_RATE = 0.03
+REGULARIZATION_RATE = 0.0
+BATCH_SIZE = 10
+NETWORK_SHAPE = (4, 2)
+INIT_WEIGHT_RANGE = 0.5
+INIT_BIAS = 0.1
+
+
+class ActivationFunction:
+    ''' An activation function and its derivative, both of the total input of the nodes. '''
+
+    def __init__(self, output, der):
+        self.output = output
+        self.der = der
+
+
+class RegularizationFunction:
+    ''' A weight regularization function and its derivative. '''
+
+    def __init__(self, output, der):
+        self.output = output
+        self.der = der
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+class Activations:
+    ''' Built-in activation functions '''
+    TANH = ActivationFunction(
+        np.tanh,
+        lambda x: 1 - np.tanh(x) ** 2)
+    RELU = ActivationFunction(
+        lambda x: np.maximum(x, 0),
+        lambda x: (x > 0).astype(float))
+    SIGMOID = ActivationFunction(
+        _sigmoid,
+        lambda x: _sigmoid(x) * (1 - _sigmoid(x)))
+    LINEAR = ActivationFunction(
+        lambda x: x,
+        lambda x: np.ones_like(x))
+
+
+class RegularizationFunctions:
+    ''' Built-in regularization functions '''
+    L1 = RegularizationFunction(
+        np.abs,
+        np.sign)
+    L2 = RegularizationFunction(
+        lambda w: 0.5 * w * w,
+        lambda w: w)
+
+
+class Errors:
+    ''' Built-in error functions: the square error 0.5 * (output - target)^2 of the playground. '''
+
+    @staticmethod
+    def square(output, target):
+        return 0.5 * (output - target) ** 2
+
+    @staticmethod
+    def square_der(output, target):
+        return output - target
+
+
+def get_activation(activation):
+    ''' Returns the ActivationFunction of a name of state.activations, or the ActivationFunction itself. '''
+    from plygdata.state import activations
+    if isinstance(activation, ActivationFunction):
+        return activation
+    if activation not in activations:
+        raise ValueError("Unknown activation: {}".format(activation))
+    return activations[activation]
+
+
+def get_regularization(regularization):
+    ''' Returns the RegularizationFunction of a name of state.regularizations (None or "none": no regularization). '''
+    from plygdata.state import regularizations
+    if regularization is None or isinstance(regularization, RegularizationFunction):
+        return regularization
+    if regularization not in regularizations:
+        raise ValueError("Unknown regularization: {}".format(regularization))
+    return regularizations[regularization]
+
+
+def forward_prop(weights, biases, x, activation, output_activation):
+    '''
+    Runs the inputs through the network.
+    The weights can have leading dimensions, e.g. (members, n_in, n_out) for a stack of networks,
+    with x of (members, n, n_in) (see population.py).
+
+    :return: (totals, outputs): the total inputs and the outputs of every layer
+    '''
+    totals = []
+    outputs = []
+    a = x
+    last = len(weights) - 1
+    for i, (W, b) in enumerate(zip(weights, biases)):
+        z = np.matmul(a, W) + b[..., np.newaxis, :]
+        a = (output_activation if i == last else activation).output(z)
+        totals.append(z)
+        outputs.append(a)
+    return totals, outputs
+
+
+def back_prop(weights, x, target, totals, outputs, activation, output_activation):
+    '''
+    Computes the derivatives of the square error summed over the batch (the accumulated derivatives of nn.ts).
+
+    :return: (weight_ders, bias_ders) of every layer
+    '''
+    weight_ders = [None] * len(weights)
+    bias_ders = [None] * len(weights)
+    last = len(weights) - 1
+    output_der = Errors.square_der(outputs[-1], target)
+    for i in range(last, -1, -1):
+        input_der = output_der * (output_activation if i == last else activation).der(totals[i])
+        a = x if i == 0 else outputs[i - 1]
+        weight_ders[i] = np.matmul(np.swapaxes(a, -1, -2), input_der)
+        bias_ders[i] = input_der.sum(axis=-2)
+        if i > 0:
+            output_der = np.matmul(input_der, np.swapaxes(weights[i], -1, -2))
+    return weight_ders, bias_ders
+
+
+def update_weights(weights, biases, dead, weight_ders, bias_ders, num_samples,
+                   learning_rate, regularization, regularization_rate):
+    '''
+    Updates the weights and the biases in place, as updateWeights of nn.ts:
+    a step of the mean derivatives, then a step of the regularization. With L1, a weight
+    crossing zero is set to zero and becomes dead (never updated again).
+    The batch size num_samples, learning_rate and regularization_rate are scalars, or arrays
+    broadcast over the leading dimensions of the weights (e.g. one rate per network of a population).
+    '''
+    step = np.asarray(learning_rate / np.asarray(num_samples, dtype=float))
+    regularization_step = np.asarray(learning_rate * np.asarray(regularization_rate, dtype=float))
+    for W, b, mask, dW, db in zip(weights, biases, dead, weight_ders, bias_ders):
+        b -= step[..., np.newaxis] * db
+        new_W = W - step[..., np.newaxis, np.newaxis] * dW
+        if regularization is not None and np.any(regularization_step != 0):
+            # The derivative of the regularization is of the weights before the step, as nn.ts.
+            regularized = new_W - regularization_step[..., np.newaxis, np.newaxis] * regularization.der(W)
+            if regularization is RegularizationFunctions.L1:
+                crossed = new_W * regularized < 0
+                regularized[crossed] = 0
+                mask |= crossed
+            new_W = regularized
+        W[...] = np.where(mask, 0.0, new_W)
+
+
+class Network:
+    '''
+     A fully connected network of the playground, trained by minibatch SGD on the square error.
+     The weights of each layer are one (n_in, n_out) matrix, so a forward pass of the whole grid
+     is a few matrix products. It has the methods of a Keras model the boundary helpers use:
+         model = Network(network_shape=(4, 2))
+         model.fit(X_train, y_train, epochs=100)
+         draw_decision_boundary(fig, ax, trained_model=model)
+         boundaries = get_node_decision_boundaries(model)
+    '''
+
+    def __init__(self, num_inputs=2, network_shape=NETWORK_SHAPE, num_outputs=1, activation='tanh',
+                 output_activation='tanh', regularization=None, regularization_rate=REGULARIZATION_RATE,
+                 learning_rate=LEARNING_RATE, seed=None):
+        '''
+        :param num_inputs: number of the inputs (e.g. len(input_ids))
+        :param network_shape: number of the neurons of each hidden layer
+        :param num_outputs: number of the outputs
+        :param activation: name of the activation of the hidden layers (see state.activations)
+        :param output_activation: name of the activation of the output layer ('tanh' for classification,
+            'linear' for regression, as the playground)
+        :param regularization: None, 'L1' or 'L2' (see state.regularizations)
+        :param regularization_rate: rate of the regularization
+        :param learning_rate: learning rate of the SGD
+        :param seed: seed of the initial weights
+        '''
+        self.shape = [num_inputs] + list(network_shape) + [num_outputs]
+        self.activation = get_activation(activation)
+        self.output_activation = get_activation(output_activation)
+        self.regularization = get_regularization(regularization)
+        self.regularization_rate = regularization_rate
+        self.learning_rate = learning_rate
+
+        rng = np.random.default_rng(seed)
+        # Same initialization as nn.ts: weights in [-0.5, 0.5) and biases of 0.1.
+        self.weights = [rng.uniform(-INIT_WEIGHT_RANGE, INIT_WEIGHT_RANGE, (n_in, n_out))
+                        for n_in, n_out in zip(self.shape[:-1], self.shape[1:])]
+        self.biases = [np.full(n_out, INIT_BIAS) for n_out in self.shape[1:]]
+        self.dead = [np.zeros(W.shape, dtype=bool) for W in self.weights]
+
+
+    def predict_layers(self, x):
+        '''
+        :param x: (n, num_inputs) inputs
+        :return: the list of the (n, neurons) outputs of every layer, the last is the output layer
+        '''
+        _, outputs = forward_prop(self.weights, self.biases, np.asarray(x, dtype=float),
+                                  self.activation, self.output_activation)
+        return outputs
+
+
+    def predict(self, x, batch_size=None, verbose=0):
+        '''
+        Same signature as the predict of Keras (batch_size and verbose are ignored).
+
+        :return: the (n, num_outputs) outputs
+        '''
+        return self.predict_layers(x)[-1]
+
+
+    def get_loss(self, x, y):
+        ''' The mean square error over the data points, as getLoss of playground.ts. '''
+        output = self.predict(x)
+        y = np.reshape(y, output.shape)
+        return Errors.square(output, y).sum(axis=1).mean()
+
+
+    def train_on_batch(self, x, y):
+        '''
+        One step of SGD over one batch, as oneStep of playground.ts.
+
+        :return: the loss of the batch before the step
+        '''
+        x = np.asarray(x, dtype=float)
+        totals, outputs = forward_prop(self.weights, self.biases, x, self.activation, self.output_activation)
+        y = np.reshape(y, outputs[-1].shape)
+        weight_ders, bias_ders = back_prop(self.weights, x, y, totals, outputs, self.activation, self.output_activation)
+        update_weights(self.weights, self.biases, self.dead, weight_ders, bias_ders, len(x),
+                       self.learning_rate, self.regularization, self.regularization_rate)
+        return Errors.square(outputs[-1], y).sum(axis=1).mean()
+
+
+    def fit(self, x, y, batch_size=BATCH_SIZE, epochs=1, shuffle=True, seed=None):
+        '''
+        Trains the network by minibatch SGD.
+
+        :return: the list of the training loss after each epoch
+        '''
+        x = np.asarray(x, dtype=float)
+        y = np.reshape(y, (len(x), -1))
+        rng = np.random.default_rng(seed)
+        history = []
+        for _ in range(epochs):
+            order = rng.permutation(len(x)) if shuffle else np.arange(len(x))
+            for start in range(0, len(x), batch_size):
+                index = order[start:start + batch_size]
+                self.train_on_batch(x[index], y[index])
+            history.append(self.get_loss(x, y))
+        return history
+
+
+    def get_weights(self):
+        ''' The weights and the biases of every layer, in the order of Keras: [W1, b1, W2, b2, ...]. '''
+        return [array.copy() for pair in zip(self.weights, self.biases) for array in pair]
+
+
+    def set_weights(self, weights):
+        ''' Sets the list of get_weights. '''
+        if len(weights) != 2 * len(self.weights):
+            raise ValueError("The number of the arrays must be {}".format(2 * len(self.weights)))
+        for i in range(len(self.weights)):
+            self.weights[i][...] = weights[2 * i]
+            self.biases[i][...] = weights[2 * i + 1]
+            self.dead[i][...] = False
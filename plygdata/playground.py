@@ -17,6 +17,7 @@
 # ==============================================================================
 
 from __future__ import division
+from collections import OrderedDict
 from plygdata.scalelinear import ScaleLinear
 import math
 import numpy as np
@@ -34,11 +35,52 @@ INPUTS = {
     'xSquared': {'f': lambda x, y: x * x, 'label': 'X_1^2'},
     'ySquared': {'f': lambda x, y: y * y,  'label': 'X_2^2'},
     'xTimesY': {'f': lambda x, y: x * y, 'label': 'X_1X_2'},
-    'sinX': {'f': lambda x, y: math.sin(x), 'label': 'sin(X_1)'},
-    'sinY': {'f': lambda x, y: math.sin(y), 'label': 'sin(X_2)'},
+    'sinX': {'f': lambda x, y: np.sin(x), 'label': 'sin(X_1)'},
+    'sinY': {'f': lambda x, y: np.sin(y), 'label': 'sin(X_2)'},
 }
 
 
+# Max number of grids cached by Player.get_boundary_array.
+BOUNDARY_CACHE_SIZE = 8
+_boundary_arrays = OrderedDict()
+
+
+def _get_grid_axes(density, domain=POINT_DOMAIN):
+    # The x of each column and the y of each row of the grid (y decreases downwards).
+    if density < 2:
+        raise ValueError("density must be 2 or more.")
+    xScale = ScaleLinear(domain=[0, density - 1], slrange=domain)
+    yScale = ScaleLinear(domain=[density - 1, 0], slrange=domain)
+    cells = np.arange(density, dtype=float)
+    return xScale(cells), yScale(cells)
+
+
+def _upsample_axis(values, src, dst, axis):
+    # Copies the rows (axis=0) or the columns (axis=1) of values at the sorted indices src into their places
+    # among the sorted indices dst (a superset of src), and interpolates linearly only the new ones.
+    values = np.moveaxis(values, axis, 0)
+    result = np.empty((len(dst),) + values.shape[1:], dtype=values.dtype)
+    position = np.searchsorted(dst, src)
+    result[position] = values
+    new = np.ones(len(dst), dtype=bool)
+    new[position] = False
+    if new.any():
+        right = np.searchsorted(src, dst[new])
+        left = right - 1
+        t = ((dst[new] - src[left]) / (src[right] - src[left]))[:, np.newaxis]
+        result[new] = values[left] * (1.0 - t) + values[right] * t
+    return np.moveaxis(result, 0, axis)
+
+
+def _get_cell_span(src, dst):
+    # The first and the last cell [src[j], src[j + 1]] containing each index of dst
+    # (two cells for an index of src between two cells, one for the others).
+    cells = len(src) - 1
+    first = np.clip(np.searchsorted(src, dst, side='left') - 1, 0, cells - 1)
+    last = np.clip(np.searchsorted(src, dst, side='right') - 1, 0, cells - 1)
+    return first, last
+
+
 class Player:
 
     # ...
@@ -62,16 +104,18 @@ class Player:
 
 
     @staticmethod
-    def update_decision_boundary(boundary=None, discretize=False):
+    def update_decision_boundary(boundary=None, discretize=False, density=DENSITY):
         '''
          Given a neural network, it asks the network for the output (prediction)
          of every node in the network using inputs sampled on a square grid.
          It returns a map where each key is the node ID and the value is a square
          matrix of the outputs of the network for each input in the grid respectively.
+         The grid is evaluated with array operations, so the density only changes the array sizes.
 
         ###:param network:
         :param boundary:
         :param discretize:
+        :param density: number of rows and columns of the grid (default: DENSITY)
         :return:
         '''
 
@@ -80,96 +124,207 @@ class Player:
             boundary = {}
             # Go through all predefined inputs.
             for nodeId in INPUTS:
-                boundary[nodeId] = np.empty([DENSITY, DENSITY])
+                boundary[nodeId] = np.empty([density, density])
             # nn.forEachNode(network, true, node => {
-            #     boundary[node.id] = np.empty([DENSITY, DENSITY])
+            #     boundary[node.id] = np.empty([density, density])
             # });
 
-        xScale = ScaleLinear(domain=[0, DENSITY - 1], slrange=POINT_DOMAIN)
-        yScale = ScaleLinear(domain=[DENSITY - 1, 0], slrange=POINT_DOMAIN)
-
-        for row in range(DENSITY):
-            for col in range(DENSITY):
-                # 1 for points inside the circle, and 0 for points outside the circle.
-                x = xScale(col)
-                y = yScale(row)
-                input = (x, y)
-                if first_time:
-                    # Go through all predefined inputs.
-                    for nodeId in INPUTS:
-                        value = INPUTS[nodeId]['f'](*input)
-                        if discretize:
-                            value = 1 if value >= 0 else -1
-                        boundary[nodeId][row][col] = value
-                # nn.forwardProp(network, *input);
-                # nn.forEachNode(network, true, node => {
-                #     value = node.output
-                #     if discretize:
-                #        value = 1 if value >= 0 else -1
-                #     boundary[nodeId][row][col] = value
-                # });
+        xs, ys = _get_grid_axes(density)
+        # An open grid: x varies along the columns and y along the rows.
+        x = xs[np.newaxis, :]
+        y = ys[:, np.newaxis]
+
+        if first_time:
+            # Go through all predefined inputs.
+            for nodeId in INPUTS:
+                value = INPUTS[nodeId]['f'](x, y)
+                if discretize:
+                    value = np.where(value >= 0, 1, -1)
+                boundary[nodeId][...] = value
+        # nn.forwardProp(network, *input);
+        # nn.forEachNode(network, true, node => {
+        #     value = node.output
+        #     if discretize:
+        #        value = 1 if value >= 0 else -1
+        #     boundary[nodeId][row][col] = value
+        # });
 
         return boundary
 
 
     @staticmethod
-    def get_boundary_array():
+    def get_boundary_array(density=DENSITY, domain=POINT_DOMAIN, input_ids=None):
         '''
         It generates a ndarray of initial boundary and return it.
+        The ndarray is cached per (density, domain, input_ids) and read-only,
+        so repeated calls cost nothing.
 
-        ###:return: a ndarray of initial boundary
+        :param density: number of rows and columns of the grid (default: DENSITY)
+        :param domain: [min, max] of x and y (default: POINT_DOMAIN)
+        :param input_ids: list of InputType ids to expand the (x, y) of the grid into (see construct_inputs)
+        ###:return: a ndarray of initial boundary: (density * density, 2), or (density * density, len(input_ids))
         '''
 
-        row_length = DENSITY * DENSITY
-        col_length = 2 # (x, y)
-        boundary_of_result = np.empty((row_length, col_length))
+        key = (density, tuple(domain), None if input_ids is None else tuple(input_ids))
+        boundary_of_result = _boundary_arrays.get(key)
+        if boundary_of_result is not None:
+            _boundary_arrays.move_to_end(key)
+            return boundary_of_result
 
-        xScale = ScaleLinear(domain=[0, DENSITY - 1], slrange=POINT_DOMAIN)
-        yScale = ScaleLinear(domain=[DENSITY - 1, 0], slrange=POINT_DOMAIN)
+        if input_ids is None:
+            xs, ys = _get_grid_axes(density, domain)
+            # Row of the ndarray = (row_of_density * density) + col_of_density
+            boundary_of_result = np.column_stack((np.tile(xs, density), np.repeat(ys, density)))
+        else:
+            boundary_of_result = Player.construct_inputs(Player.get_boundary_array(density, domain), input_ids)
 
-        for row_of_density in range(DENSITY):
-            for col_of_density in range(DENSITY):
-                x = xScale(col_of_density)
-                y = yScale(row_of_density)
-                row = (row_of_density * DENSITY) + col_of_density
-                boundary_of_result[row][0] = x
-                boundary_of_result[row][1] = y
+        boundary_of_result.flags.writeable = False
+        _boundary_arrays[key] = boundary_of_result
+        while len(_boundary_arrays) > BOUNDARY_CACHE_SIZE:
+            _boundary_arrays.popitem(last=False)
 
         return boundary_of_result
 
 
     @staticmethod
-    def get_decision_boundary_of_node(probability, discretize=False):
+    def get_decision_boundary_of_node(probability, discretize=False, density=None):
         '''
          It returns desicison boundary from a ndarray of prediction.
+         The boundary is a reshaped view of the prediction (a new array only if discretize).
 
         ###:param network:
-        :param probability:
+        :param probability: prediction over get_boundary_array(): (density * density,), (density * density, 1),
+            or (density * density, k) for k outputs of a model
         :param discretize:
-        :return:
+        :param density: number of rows and columns of the grid (default: inferred from the length of probability)
+        :return: a (density, density) matrix, or (k, density, density) matrices for k outputs
         '''
 
-        boundary_of_node = np.empty([DENSITY, DENSITY])
+        probability = np.asarray(probability)
+        length = len(probability)
+        if density is None:
+            density = int(round(math.sqrt(length)))
+        if length != density * density:
+            raise ValueError("The length of probability must be density * density.")
 
-        for row in range(DENSITY):
-            for col in range(DENSITY):
-                row_of_array = (row * DENSITY) + col
-                value = probability[row_of_array]
-                if discretize:
-                    value = 1 if value >= 0 else -1
-                boundary_of_node[row][col] = value
+        if probability.ndim == 1 or probability.shape[1] == 1:
+            boundary_of_node = probability.reshape(density, density)
+        else:
+            # Each output column to a matrix: (k, density, density).
+            boundary_of_node = probability.reshape(density, density, -1).transpose(2, 0, 1)
+
+        if discretize:
+            boundary_of_node = np.where(boundary_of_node >= 0, 1.0, -1.0)
 
         return boundary_of_node
 
 
-    # function getLoss(network: nn.Node[][], dataPoints: Example2D[]): number
+    @staticmethod
+    def get_adaptive_decision_boundary(predict, discretize=False, density=DENSITY, tolerance=0.05, coarse_density=17, input_ids=None):
+        '''
+         It returns the decision boundary of a model, evaluating the model only where it is needed.
+         The model is evaluated on a coarse grid first. Then, level by level, the grid is halved,
+         and only the cells whose corners disagree in sign or differ by more than tolerance
+         are evaluated on the finer grid. The other cells are interpolated bilinearly.
+         Each level is a single call of predict.
+
+        :param predict: a function taking the rows of get_boundary_array(density, input_ids=input_ids)
+            and returning their predictions: (m,) or (m, k) (the first output is used)
+        :param discretize:
+        :param density: number of rows and columns of the grid (default: DENSITY)
+        :param tolerance: max difference between the corners of an interpolated cell
+        :param coarse_density: number of rows and columns of the first grid
+        :param input_ids: list of InputType ids the model takes as its inputs (default: x and y)
+        :return: a (density, density) matrix
+        '''
+
+        grid = Player.get_boundary_array(density, input_ids=input_ids)
+
+        def evaluate(rows, cols):
+            prediction = np.asarray(predict(grid[rows * density + cols]))
+            return prediction.reshape(len(rows), -1)[:, 0]
+
+        # Row (and column) indices of the current grid.
+        lattice = np.unique(np.round(np.linspace(0, density - 1, max(2, min(coarse_density, density)))).astype(int))
+        rows, cols = np.meshgrid(lattice, lattice, indexing='ij')
+        values = evaluate(rows.ravel(), cols.ravel()).reshape(len(lattice), len(lattice))
+        exact = np.ones(values.shape, dtype=bool)
+
+        while len(lattice) < density:
+            gaps = np.diff(lattice) > 1
+            finer = np.union1d(lattice, (lattice[:-1][gaps] + lattice[1:][gaps]) // 2)
+
+            # Cells to refine: sign disagreement or a difference beyond the tolerance.
+            corners = np.stack((values[:-1, :-1], values[1:, :-1], values[:-1, 1:], values[1:, 1:]))
+            high = corners.max(axis=0)
+            low = corners.min(axis=0)
+            refine = ((high >= 0) & (low < 0)) | (high - low > tolerance)
+
+            # Interpolate the new rows and columns, then evaluate the points of the cells to refine.
+            # Everything is indexing of (len(finer), len(finer)) arrays, without any matrix product.
+            values = _upsample_axis(_upsample_axis(values, lattice, finer, 0), lattice, finer, 1)
+            position = np.searchsorted(finer, lattice)
+            finerExact = np.zeros(values.shape, dtype=bool)
+            finerExact[np.ix_(position, position)] = exact
+            exact = finerExact
+
+            # A point needs an evaluation if any of the cells it is in (up to 2 x 2 cells) is refined.
+            first, last = _get_cell_span(lattice, finer)
+            needed = (refine[np.ix_(first, first)] | refine[np.ix_(first, last)]
+                      | refine[np.ix_(last, first)] | refine[np.ix_(last, last)]) & ~exact
+            rowIndex, colIndex = np.nonzero(needed)
+            if len(rowIndex) > 0:
+                values[rowIndex, colIndex] = evaluate(finer[rowIndex], finer[colIndex])
+                exact[rowIndex, colIndex] = True
+            lattice = finer
+
+        if discretize:
+            values = np.where(values >= 0, 1.0, -1.0)
+
+        return values
+
+
+    # function getLoss(network: nn.Node[][], dataPoints: Example2D[]): number -> nn.Network.get_loss
     # function updateUI(firstStep = false)
     # function zeroPad(n: number): string
     # function addCommas(s: string): string
     # function humanReadable(n: number): string
     # function constructInputIds(): string[]
     # function constructInput(x: number, y: number): number[]
-    # function oneStep(): void
+
+
+    @staticmethod
+    def construct_inputs(points, input_ids=None, out=None):
+        '''
+         Expands points into the features of the given inputs, as constructInput does for
+         one point, but for all the points at once.
+
+        :param points: (n, 2) array of (x, y)
+        :param input_ids: list of InputType ids (default: all the INPUTS)
+        :param out: (n, k) array to write the features into (reused instead of a new array)
+        :return: the (n, k) features
+        '''
+        if input_ids is None:
+            input_ids = list(INPUTS)
+        for nodeId in input_ids:
+            if nodeId not in INPUTS:
+                raise ValueError("Unknown input id: {}".format(nodeId))
+
+        points = np.asarray(points)
+        if out is None:
+            dtype = points.dtype if np.issubdtype(points.dtype, np.floating) else float
+            out = np.empty((len(points), len(input_ids)), dtype=dtype)
+        elif out.shape != (len(points), len(input_ids)):
+            raise ValueError("The shape of out must be {}".format((len(points), len(input_ids))))
+
+        x = points[:, 0]
+        y = points[:, 1]
+        for col, nodeId in enumerate(input_ids):
+            out[:, col] = INPUTS[nodeId]['f'](x, y)
+
+        return out
+
+    # function oneStep(): void -> nn.Network.train_on_batch
     # export function getOutputWeights(network: nn.Node[][]): number[]
     # function reset(onStartup=false)
     # function initTutorial()
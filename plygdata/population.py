@@ -0,0 +1,166 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import numpy as np
+from plygdata.nn import Network, Errors, forward_prop, back_prop, update_weights, get_activation, get_regularization, \
+    LEARNING_RATE, REGULARIZATION_RATE, BATCH_SIZE, NETWORK_SHAPE, INIT_WEIGHT_RANGE, INIT_BIAS
+from plygdata.playground import Player, DENSITY
+
+
+class Population:
+    '''
+     A population of same-shaped networks (see nn.Network) trained together.
+     The weights of each layer of all the members are one (members, n_in, n_out) tensor,
+     so each step of the whole population is a few batched matrix products:
+         population = Population(1000, network_shape=(4, 2), learning_rate=np.linspace(0.001, 0.1, 1000))
+         losses = population.fit(X_train, y_train, epochs=100)    # (epochs, members)
+         boundaries = population.get_decision_boundaries()       # (members, density, density)
+
+     The members share the activations and the regularization function.
+     The learning rate and the regularization rate can be one per member.
+    '''
+
+    def __init__(self, size, num_inputs=2, network_shape=NETWORK_SHAPE, num_outputs=1, activation='tanh',
+                 output_activation='tanh', regularization=None, regularization_rate=REGULARIZATION_RATE,
+                 learning_rate=LEARNING_RATE, seed=None):
+        '''
+        :param size: number of the members
+        :param learning_rate: a scalar, or an array of one learning rate per member
+        :param regularization_rate: a scalar, or an array of one regularization rate per member
+        :param seed: seed of the initial weights
+        The other parameters: see nn.Network
+        '''
+        if size <= 0:
+            raise ValueError("size must be positive.")
+
+        self.size = size
+        self.shape = [num_inputs] + list(network_shape) + [num_outputs]
+        self.activation = get_activation(activation)
+        self.output_activation = get_activation(output_activation)
+        self.regularization = get_regularization(regularization)
+        self.regularization_rate = self._get_member_values(regularization_rate, 'regularization_rate')
+        self.learning_rate = self._get_member_values(learning_rate, 'learning_rate')
+
+        rng = np.random.default_rng(seed)
+        self.weights = [rng.uniform(-INIT_WEIGHT_RANGE, INIT_WEIGHT_RANGE, (size, n_in, n_out))
+                        for n_in, n_out in zip(self.shape[:-1], self.shape[1:])]
+        self.biases = [np.full((size, n_out), INIT_BIAS) for n_out in self.shape[1:]]
+        self.dead = [np.zeros(W.shape, dtype=bool) for W in self.weights]
+
+
+    def __len__(self):
+        return self.size
+
+
+    def predict_layers(self, x):
+        '''
+        :param x: (n, num_inputs) inputs shared by the members, or (members, n, num_inputs)
+        :return: the list of the (members, n, neurons) outputs of every layer
+        '''
+        _, outputs = forward_prop(self.weights, self.biases, np.asarray(x, dtype=float),
+                                  self.activation, self.output_activation)
+        return outputs
+
+
+    def predict(self, x):
+        '''
+        :return: the (members, n, num_outputs) outputs
+        '''
+        return self.predict_layers(x)[-1]
+
+
+    def get_loss(self, x, y):
+        '''
+        :param y: (n, num_outputs) targets shared by the members, or (members, n, num_outputs)
+        :return: the (members,) mean square errors
+        '''
+        output = self.predict(x)
+        y = np.reshape(y, output.shape[-3 if np.ndim(y) == 3 else -2:])
+        return Errors.square(output, y).sum(axis=2).mean(axis=1)
+
+
+    def train_on_batch(self, x, y):
+        '''
+        One step of SGD of every member over one batch.
+
+        :return: the (members,) losses of the batch before the step
+        '''
+        x = np.asarray(x, dtype=float)
+        totals, outputs = forward_prop(self.weights, self.biases, x, self.activation, self.output_activation)
+        y = np.reshape(y, outputs[-1].shape[-3 if np.ndim(y) == 3 else -2:])
+        weight_ders, bias_ders = back_prop(self.weights, x, y, totals, outputs, self.activation, self.output_activation)
+        update_weights(self.weights, self.biases, self.dead, weight_ders, bias_ders, x.shape[-2],
+                       self.learning_rate, self.regularization, self.regularization_rate)
+        return Errors.square(outputs[-1], y).sum(axis=2).mean(axis=1)
+
+
+    def fit(self, x, y, batch_size=BATCH_SIZE, epochs=1, shuffle=True, seed=None):
+        '''
+        Trains every member by minibatch SGD. The members see the same batches in the same order.
+
+        :param x: (n, num_inputs) inputs shared by the members, or (members, n, num_inputs)
+        :param y: (n,) or (n, num_outputs) targets shared by the members, or (members, n, num_outputs)
+        :return: the (epochs, members) training losses after each epoch
+        '''
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if y.ndim < x.ndim:
+            y = y.reshape(y.shape + (1,))
+        length = x.shape[-2]
+        rng = np.random.default_rng(seed)
+        history = np.empty((epochs, self.size))
+        for epoch in range(epochs):
+            order = rng.permutation(length) if shuffle else np.arange(length)
+            for start in range(0, length, batch_size):
+                index = order[start:start + batch_size]
+                self.train_on_batch(x[..., index, :], y[..., index, :])
+            history[epoch] = self.get_loss(x, y)
+        return history
+
+
+    def get_decision_boundaries(self, density=DENSITY, discretize=False, input_ids=None, output_index=0):
+        '''
+        :param density: number of rows and columns of the grid
+        :param discretize: -1 or 1 instead of the values
+        :param input_ids: list of InputType ids the members take as their inputs (default: x and y)
+        :param output_index: output of the members to draw
+        :return: the (members, density, density) boundaries
+        '''
+        boundary_array = Player.get_boundary_array(density=density, input_ids=input_ids)
+        boundaries = self.predict(boundary_array)[:, :, output_index].reshape(self.size, density, density)
+        if discretize:
+            boundaries = np.where(boundaries >= 0, 1.0, -1.0)
+        return boundaries
+
+
+    def get_member(self, index):
+        '''
+        :return: a nn.Network with the weights of a member (e.g. for draw_decision_boundary)
+        '''
+        network = Network(self.shape[0], self.shape[1:-1], self.shape[-1], self.activation, self.output_activation,
+                          self.regularization, self.regularization_rate[index], self.learning_rate[index])
+        network.set_weights([array[index] for pair in zip(self.weights, self.biases) for array in pair])
+        network.dead = [mask[index].copy() for mask in self.dead]
+        return network
+
+
+    def _get_member_values(self, value, name):
+        values = np.broadcast_to(np.asarray(value, dtype=float), (self.size,))
+        if np.any(values < 0):
+            raise ValueError("{} must not be negative.".format(name))
+        return values.copy()
@@ -16,21 +16,23 @@
 # limitations under the License.
 # ==============================================================================
 
+from plygdata.nn import Activations, RegularizationFunctions
+
 
 ''' A map between names and activation functions. '''
-# export let activations: {[key: string]: nn.ActivationFunction} = {
-#   "relu": nn.Activations.RELU,
-#   "tanh": nn.Activations.TANH,
-#   "sigmoid": nn.Activations.SIGMOID,
-#   "linear": nn.Activations.LINEAR
-# };
+activations = {
+    "relu": Activations.RELU,
+    "tanh": Activations.TANH,
+    "sigmoid": Activations.SIGMOID,
+    "linear": Activations.LINEAR
+}
 
 ''' A map between names and regularization functions. '''
-# export let regularizations: {[key: string]: nn.RegularizationFunction} = {
-#   "none": null,
-#   "L1": nn.RegularizationFunction.L1,
-#   "L2": nn.RegularizationFunction.L2
-# };
+regularizations = {
+    "none": None,
+    "L1": RegularizationFunctions.L1,
+    "L2": RegularizationFunctions.L2
+}
 
 ''' The names of classification and regression dataset-type. '''
 class DatasetType:
@@ -41,6 +43,11 @@ class DatasetType:
     RegressPlane = "reg-plane"
     RegressGaussian = "reg-gauss"
 
+''' The names of data-generation backend-type. '''
+class BackendType:
+    Python = "python"
+    NumPy = "numpy"
+
 ''' The names of input data-type. '''
 class InputType:
     X1 = "x"
@@ -0,0 +1,281 @@
+# ==============================================================================
+# Copyright 2018-2019 Digital Advantage Co., Ltd. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from __future__ import division
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from plygdata.datahelper import split_data
+from plygdata.dataset import generate_data
+from plygdata.nn import Network, BATCH_SIZE
+from plygdata.playground import Player
+from plygdata.state import BackendType
+
+
+EPOCHS = 100
+
+
+def get_sweep_configs(data_types, noises=(0.0,), validation_sizes=(0.5,), model_settings=({},), seeds=(0,), num_samples=None):
+    '''
+    Makes the grid of the configurations of a sweep: every combination of the given values.
+
+    :param data_types: list of DatasetType
+    :param noises: list of noise levels
+    :param validation_sizes: list of validation_size of split_data
+    :param model_settings: list of dicts of the parameters of nn.Network, and of 'epochs' and 'batch_size' of fit
+    :param seeds: list of seeds of the data, the split and the network
+    :param num_samples: number of samples of the data (default: see get_num_samples)
+    :return: the list of the configurations (dicts)
+    '''
+    # Plain Python values (not numpy scalars, e.g. of np.arange), so that the configurations are JSON serializable.
+    return [_to_python({'data_type': data_type, 'noise': noise, 'validation_size': validation_size,
+                        'model': dict(settings), 'seed': seed, 'num_samples': num_samples})
+            for data_type, noise, validation_size, settings, seed
+            in itertools.product(data_types, noises, validation_sizes, model_settings, seeds)]
+
+
+def _to_python(value):
+    if isinstance(value, dict):
+        return dict((key, _to_python(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_to_python(item) for item in value]
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    return value
+
+
+def _to_json(value):
+    # The default of json.dumps: numpy scalars and arrays in a configuration given by hand.
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+def get_config_key(config):
+    ''' A string identifying a configuration, used to resume a sweep. '''
+    return json.dumps(config, sort_keys=True, default=_to_json)
+
+
+def run_config(config, density=None):
+    '''
+    Runs one configuration: generate_data, split_data, and the training of a nn.Network.
+
+    :param config: a configuration of get_sweep_configs
+    :param density: if not None, the boundary of the trained network over a grid of this density is returned
+    :return: a dict of the config, the losses ('train_loss', 'valid_loss' and the 'history' of each epoch),
+        the 'times' of each stage in seconds, and the 'boundary' (when density is given)
+    '''
+    times = {}
+    start = time.perf_counter()
+    seed = config.get('seed')
+
+    data = generate_data(config['data_type'], config['noise'], backend=BackendType.NumPy,
+                         seed=seed, num_samples=config.get('num_samples'))
+    times['generate'] = time.perf_counter() - start
+
+    lap = time.perf_counter()
+    X_train, y_train, X_valid, y_valid = split_data(data, validation_size=config['validation_size'], seed=seed)
+    times['split'] = time.perf_counter() - lap
+
+    lap = time.perf_counter()
+    settings = dict(config.get('model', {}))
+    epochs = settings.pop('epochs', EPOCHS)
+    batch_size = settings.pop('batch_size', BATCH_SIZE)
+    model = Network(num_inputs=X_train.shape[1], seed=seed, **settings)
+    history = model.fit(X_train, y_train, batch_size=batch_size, epochs=epochs, seed=seed)
+    times['train'] = time.perf_counter() - lap
+
+    result = {
+        'config': config,
+        'train_loss': float(model.get_loss(X_train, y_train)),
+        'valid_loss': float(model.get_loss(X_valid, y_valid)) if len(X_valid) > 0 else None,
+        'history': [float(loss) for loss in history],
+    }
+
+    if density is not None:
+        lap = time.perf_counter()
+        probability = model.predict(Player.get_boundary_array(density=density))
+        result['boundary'] = Player.get_decision_boundary_of_node(probability, density=density)
+        times['boundary'] = time.perf_counter() - lap
+
+    times['total'] = time.perf_counter() - start
+    result['times'] = times
+    return result
+
+
+def run_sweep(configs, num_workers=None, results_path=None, density=None, max_retries=2, run_fn=run_config):
+    '''
+    Runs the configurations on a process pool, and yields the result of each configuration as it finishes
+    (in the order of completion, not of configs).
+
+    With results_path, each result is appended to a JSON lines file as soon as it finishes
+    (the boundaries are saved as .npy files in the directory results_path + '.boundaries'),
+    and the configurations already in the file are skipped: running the same sweep again after
+    an interruption resumes it (the configurations whose result is an error are run again).
+    Read the file with load_sweep_results.
+
+    A configuration which fails (an exception, or a crash of its worker) is run again up to max_retries times,
+    each time in a process of its own. After that, its result has an 'error' instead of the losses.
+    When a worker crashes, the pool cannot tell which of its configurations crashed it, so the unfinished
+    configurations of the pool are run again in processes of their own, without counting it as a failure.
+
+    :param configs: list of configurations (see get_sweep_configs)
+    :param num_workers: number of processes (default: the number of CPUs). 1 runs in this process.
+    :param results_path: JSON lines file of the results (default: not written)
+    :param density: if not None, the boundary of each trained network is in the results (see run_config)
+    :param max_retries: number of the retries of a failed configuration
+    :param run_fn: the function running a configuration, run_fn(config, density), returning a dict with
+        the 'config' (and a 'boundary' ndarray to save it as a .npy file), e.g. training a Keras model.
+        It must be picklable (a function of a module, not a lambda) to run on the process pool.
+    :return: a generator of the results (see run_config)
+    '''
+    done = set()
+    if results_path is not None and os.path.exists(results_path):
+        _end_partial_line(results_path)
+        done = set(get_config_key(result['config']) for result in load_sweep_results(results_path, load_boundaries=False)
+                   if 'error' not in result)
+
+    pending = []
+    for config in configs:
+        key = get_config_key(config)
+        if key not in done:
+            done.add(key)
+            pending.append(config)
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    failures = {}
+    isolate = False
+    while pending:
+        retries = []
+        for config, result, error, broken in _run_configs(run_fn, pending, num_workers, density, isolate):
+            if broken and not isolate:
+                retries.append(config)
+                continue
+            if error is not None:
+                key = get_config_key(config)
+                failures[key] = failures.get(key, 0) + 1
+                if failures[key] <= max_retries:
+                    retries.append(config)
+                    continue
+                result = {'config': config, 'error': error}
+            if results_path is not None:
+                _save_result(results_path, result)
+            yield result
+        pending = retries
+        isolate = True
+
+
+def load_sweep_results(results_path, load_boundaries=True):
+    '''
+    Reads the results written by run_sweep.
+    A configuration run again after a resume (e.g. an error) has several records: the last one is returned.
+
+    :param load_boundaries: load the boundaries (memory-mapped) into 'boundary'
+    :return: the list of the results, one per configuration, in the order they finished
+    '''
+    results = OrderedDict()
+    with open(results_path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # The last line of an interrupted sweep can be partial. Its configuration is run again.
+                continue
+            key = get_config_key(result['config'])
+            results.pop(key, None)
+            results[key] = result
+
+    results = list(results.values())
+    if load_boundaries:
+        for result in results:
+            if 'boundary_file' in result:
+                result['boundary'] = np.load(os.path.join(_get_boundary_directory(results_path), result['boundary_file']), mmap_mode='r')
+    return results
+
+
+def _run_configs(run_fn, configs, num_workers, density, isolate):
+    # Yields (config, result, error, broken) of every config, where broken means that a worker
+    # of the pool crashed (BrokenProcessPool). New pools are used for each call, so that a crashed
+    # worker is replaced. With isolate, each config has a pool of its own (num_workers pools at a time),
+    # so that a crash is only the failure of the config which crashed.
+    if num_workers <= 1:
+        for config in configs:
+            try:
+                yield config, run_fn(config, density), None, False
+            except Exception as e:
+                yield config, None, repr(e), False
+        return
+
+    groups = [configs[start:start + num_workers] for start in range(0, len(configs), num_workers)] if isolate else [configs]
+    for group in groups:
+        executors = [ProcessPoolExecutor(max_workers=1) for _ in group] if isolate \
+            else [ProcessPoolExecutor(max_workers=num_workers)] * len(group)
+        try:
+            futures = dict((executor.submit(run_fn, config, density), config) for executor, config in zip(executors, group))
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None, False
+                except BrokenProcessPool as e:
+                    yield futures[future], None, repr(e), True
+                except Exception as e:
+                    yield futures[future], None, repr(e), False
+        finally:
+            for executor in set(executors):
+                executor.shutdown()
+
+
+def _get_boundary_directory(results_path):
+    return results_path + '.boundaries'
+
+
+def _end_partial_line(results_path):
+    # Terminates the partial last line of an interrupted sweep, so that the next result starts on its own line.
+    with open(results_path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+
+def _save_result(results_path, result):
+    record = dict(result)
+    boundary = record.pop('boundary', None)
+    if boundary is not None:
+        directory = _get_boundary_directory(results_path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        file_name = hashlib.sha1(get_config_key(record['config']).encode()).hexdigest() + '.npy'
+        np.save(os.path.join(directory, file_name), boundary)
+        record['boundary_file'] = file_name
+
+    # One line per result, flushed at once, so that an interrupted sweep keeps every finished result.
+    with open(results_path, 'a') as f:
+        f.write(json.dumps(record, sort_keys=True, default=_to_json) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
@@ -141,7 +141,9 @@ setup(
     # For an analysis of "install_requires" vs pip's requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
     setup_requires=['numpy'],  # for python 2.7.1: https://github.com/numpy/numpy/issues/2434
-    install_requires=['numpy', 'matplotlib'],  # Optional
+    # numpy.random.default_rng / SeedSequence / Generator need NumPy 1.17 or later.
+    install_requires=['numpy>=1.17', 'matplotlib'],  # Optional
+    python_requires='>=3',
 
     # List additional groups of dependencies here (e.g. development
     # dependencies). Users will be able to install these using the "extras"
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from plygdata.boundaryrecorder import BoundaryRecorder
+from plygdata.playground import Player
+
+
+class _LinearModel:
+
+    def __init__(self):
+        self.scale = 0.0
+
+    def predict(self, x, batch_size=32, verbose=0):
+        return np.tanh(self.scale * (x[:, :1] + x[:, 1:2]))
+
+
+def _train(recorder, model, epochs, batches):
+    recorder.set_model(model)
+    recorder.on_train_begin()
+    for epoch in range(epochs):
+        for batch in range(batches):
+            model.scale += 0.1
+            recorder.on_train_batch_end(batch)
+        recorder.on_epoch_end(epoch)
+
+
+def test_records_every_epoch_into_ring_buffer():
+    recorder = BoundaryRecorder(every=2, unit='epoch', capacity=3, density=10, dtype=np.float32)
+    model = _LinearModel()
+    _train(recorder, model, epochs=10, batches=2)
+
+    assert len(recorder) == 3
+    assert list(recorder.get_steps()) == [6, 8, 10]
+    frames = recorder.get_frames()
+    assert frames.shape == (3, 10, 10)
+    model.scale = 2.0
+    expected = Player.get_decision_boundary_of_node(model.predict(recorder.grid)[:, 0], density=10)
+    assert np.allclose(frames[-1], expected)
+
+
+def test_records_every_batch_quantized():
+    recorder = BoundaryRecorder(every=3, unit='batch', capacity=10, density=10, dtype=np.uint8)
+    model = _LinearModel()
+    _train(recorder, model, epochs=2, batches=5)
+
+    assert list(recorder.get_steps()) == [3, 6, 9]
+    assert recorder.get_frames(dequantize=False).dtype == np.uint8
+    model.scale = 0.9
+    expected = Player.get_decision_boundary_of_node(model.predict(recorder.grid)[:, 0], density=10)
+    assert np.abs(recorder.get_frames()[-1] - expected).max() <= 1 / 255 + 1e-6
+
+
+class _KerasLikeModel(_LinearModel):
+
+    def predict(self, x, batch_size=32, verbose=0):
+        raise AssertionError("predict_on_batch should be used")
+
+    def predict_on_batch(self, x):
+        return _LinearModel.predict(self, x)
+
+
+def test_records_with_predict_on_batch():
+    recorder = BoundaryRecorder(every=1, unit='batch', capacity=5, density=10, dtype=np.float32)
+    model = _KerasLikeModel()
+    _train(recorder, model, epochs=1, batches=3)
+    expected = Player.get_decision_boundary_of_node(_LinearModel.predict(model, recorder.grid)[:, 0], density=10)
+    assert np.allclose(recorder.get_frames()[-1], expected)
+
+
+def test_invalid_unit():
+    with pytest.raises(ValueError):
+        BoundaryRecorder(unit='step')
+
+
+def test_animation_on_given_axes(tmp_path):
+    matplotlib = pytest.importorskip('matplotlib')
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    recorder = BoundaryRecorder(density=10, capacity=4)
+    _train(recorder, _LinearModel(), epochs=3, batches=1)
+    fig, ax = plt.subplots()
+    recorder.to_animation(ax=ax).save(str(tmp_path / 'boundary.gif'), writer='pillow')
+    assert (tmp_path / 'boundary.gif').exists()
+    plt.close(fig)
+
+
+def test_keras_fit_with_recorder():
+    keras = pytest.importorskip('tensorflow.keras')
+    model = keras.Sequential([keras.Input(shape=(2,)), keras.layers.Dense(4, activation='tanh'),
+                              keras.layers.Dense(1, activation='tanh')])
+    model.compile(optimizer='sgd', loss='mse')
+    recorder = BoundaryRecorder(every=2, unit='batch', density=10)
+    X = np.random.default_rng(0).uniform(-6, 6, (40, 2))
+    model.fit(X, np.sign(X[:, :1]), batch_size=10, epochs=2, callbacks=[recorder], verbose=0)
+    assert list(recorder.get_steps()) == [2, 4, 6, 8]
@@ -0,0 +1,58 @@
+import numpy as np
+
+from plygdata.datacache import DataCache
+from plygdata.dataset import generate_data
+from plygdata.state import DatasetType, BackendType
+
+
+def test_memory_tier_hits_and_eviction():
+    cache = DataCache(max_bytes=2 * 500 * 3 * 8)
+    a = cache.generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=1)
+    assert np.array_equal(a, generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=1))
+    assert cache.generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=1) is a
+    assert not a.flags.writeable
+
+    cache.generate_data(DatasetType.ClassifyXORData, 0.2, backend=BackendType.NumPy, seed=1)
+    cache.generate_data(DatasetType.ClassifyXORData, 0.3, backend=BackendType.NumPy, seed=1)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 3, 2)
+
+
+def test_unseeded_calls_are_not_cached():
+    cache = DataCache()
+    a = cache.generate_data(DatasetType.RegressPlane, backend=BackendType.NumPy)
+    b = cache.generate_data(DatasetType.RegressPlane, backend=BackendType.NumPy)
+    assert not np.array_equal(a, b)
+    assert cache.stats()['entries'] == 0
+
+
+def test_python_backend_is_not_cached():
+    cache = DataCache()
+    a = cache.generate_data(DatasetType.ClassifyXORData, backend=BackendType.Python, seed=1)
+    b = cache.generate_data(DatasetType.ClassifyXORData, backend=BackendType.Python, seed=1)
+    assert a is not b
+    stats = cache.stats()
+    assert (stats['entries'], stats['misses'], stats['uncached']) == (0, 0, 2)
+
+
+def test_defaults_to_the_numpy_backend():
+    cache = DataCache()
+    a = cache.generate_data(DatasetType.ClassifyXORData, 0.1, seed=1)
+    assert np.array_equal(a, generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=1))
+    assert cache.generate_data(DatasetType.ClassifyXORData, 0.1, seed=1) is a
+    assert cache.invalidate(DatasetType.ClassifyXORData, 0.1, seed=1)
+
+
+def test_disk_tier_and_invalidation(tmp_path):
+    directory = str(tmp_path)
+    a = DataCache(directory=directory).generate_data(DatasetType.ClassifySpiralData, 0.3, backend=BackendType.NumPy, seed=2, num_samples=100)
+
+    cache = DataCache(directory=directory)
+    b = cache.generate_data(DatasetType.ClassifySpiralData, 0.3, backend=BackendType.NumPy, seed=2, num_samples=100)
+    assert isinstance(b, np.memmap)
+    assert np.array_equal(a, b)
+    assert cache.stats()['disk_hits'] == 1
+
+    assert cache.invalidate(DatasetType.ClassifySpiralData, 0.3, backend=BackendType.NumPy, seed=2, num_samples=100)
+    assert not cache.invalidate(DatasetType.ClassifySpiralData, 0.3, backend=BackendType.NumPy, seed=2, num_samples=100)
+    assert len(list(tmp_path.iterdir())) == 0
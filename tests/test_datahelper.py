@@ -0,0 +1,180 @@
+import numpy as np
+import pytest
+
+from plygdata.datahelper import split_data, kfold_split_data, repeated_split_data, get_node_decision_boundaries, \
+    predict_boundary, clear_prediction_cache, _get_node_layer_outputs
+from plygdata.dataset import generate_data
+from plygdata.playground import Player
+from plygdata.state import DatasetType, BackendType, LayerType, NeuronType
+
+
+def _make_data():
+    return generate_data(DatasetType.ClassifyTwoGaussData, 0.5, backend=BackendType.NumPy, seed=0)
+
+
+def test_split_data_keeps_legacy_shapes():
+    X_train, y_train, X_valid, y_valid = split_data(_make_data(), validation_size=0.3)
+    assert X_train.shape == (350, 2) and y_train.shape == (350, 1)
+    assert X_valid.shape == (150, 2) and y_valid.shape == (150, 1)
+
+
+def test_split_data_by_index_is_seeded():
+    data = _make_data()
+    a = split_data(data, validation_size=0.3, seed=1)
+    b = split_data(data, validation_size=0.3, seed=1)
+    assert all(np.array_equal(x, y) for x, y in zip(a, b))
+
+    train_index, valid_index = split_data(data, validation_size=0.3, seed=1, return_indices=True)
+    assert np.array_equal(np.sort(np.concatenate((train_index, valid_index))), np.arange(len(data)))
+    assert np.array_equal(data[train_index, :2], a[0])
+    assert np.array_equal(data[valid_index, 2:], a[3])
+
+
+@pytest.mark.parametrize('stratify', [False, True])
+def test_split_data_inplace_returns_views(stratify):
+    data = _make_data()
+    rows = set(map(tuple, data))
+    X_train, y_train, X_valid, y_valid = split_data(data, validation_size=0.3, inplace=True, stratify=stratify, seed=2)
+    assert np.shares_memory(X_train, data) and np.shares_memory(y_valid, data)
+    assert set(map(tuple, data)) == rows
+    assert np.array_equal(np.hstack((X_train, y_train)), data[:len(X_train)])
+
+
+def test_split_data_stratified():
+    data = _make_data()[:400]  # 250 positive and 150 negative rows.
+    _, y_train, _, y_valid = split_data(data, validation_size=0.2, stratify=True, seed=3)
+    assert (np.sum(y_train == 1), np.sum(y_train == -1)) == (200, 120)
+    assert (np.sum(y_valid == 1), np.sum(y_valid == -1)) == (50, 30)
+
+
+@pytest.mark.parametrize('stratify', [False, True])
+def test_kfold_split_data(stratify):
+    data = _make_data()[:403]
+    valid = []
+    for X_train, y_train, X_valid, y_valid in kfold_split_data(data, n_splits=10, stratify=stratify, seed=4):
+        assert X_train.shape[1] == 2 and y_train.shape[1] == 1
+        assert len(X_train) + len(X_valid) == 403
+        assert len(X_valid) in (40, 41)
+        valid.append(np.hstack((X_valid, y_valid)))
+        if stratify:
+            assert np.sum(y_valid == -1) in (15, 16)
+    assert sorted(map(tuple, np.concatenate(valid))) == sorted(map(tuple, data))
+
+
+def test_stratify_rejects_continuous_labels():
+    data = generate_data(DatasetType.RegressPlane, 0.1, backend=BackendType.NumPy, seed=0, num_samples=100)
+    with pytest.raises(ValueError):
+        split_data(data, validation_size=0.3, stratify=True)
+    with pytest.raises(ValueError):
+        next(kfold_split_data(data, stratify=True))
+
+
+def test_repeated_split_data_matches_split_data_indices():
+    data = _make_data()
+    splits = list(repeated_split_data(data, n_repeats=3, validation_size=0.2, return_indices=True, seed=5))
+    assert len(splits) == 3
+    for train_index, valid_index in splits:
+        assert (len(train_index), len(valid_index)) == (400, 100)
+    assert not np.array_equal(splits[0][0], splits[1][0])
+    first = next(repeated_split_data(data, 1, 0.2, seed=5))
+    assert all(np.array_equal(a, b) for a, b in zip(first, split_data(data, validation_size=0.2, seed=5)))
+
+
+class _TwoLayerModel:
+
+    def __init__(self):
+        self.W1 = np.array([[1.0, -1.0, 0.5], [1.0, 1.0, -0.5]])
+        self.W2 = np.array([[1.0], [-1.0], [2.0]])
+
+    def predict_layers(self, x):
+        hidden = np.tanh(x.dot(self.W1))
+        return [hidden, np.tanh(hidden.dot(self.W2))]
+
+
+def test_get_node_decision_boundaries():
+    model = _TwoLayerModel()
+    boundaries = get_node_decision_boundaries(model, density=20)
+    assert sorted(boundaries) == [(LayerType.L1, NeuronType.N1), (LayerType.L1, NeuronType.N2),
+                                  (LayerType.L1, NeuronType.N3), (LayerType.L2, NeuronType.N1)]
+
+    grid = Player.get_boundary_array(20)
+    hidden, output = model.predict_layers(grid)
+    assert np.allclose(boundaries[(LayerType.L1, NeuronType.N2)], hidden[:, 1].reshape(20, 20))
+    assert np.allclose(boundaries[(LayerType.L2, NeuronType.N1)], output.reshape(20, 20))
+
+
+class _StubLayer:
+
+    def __init__(self, name, shape, kernel=False):
+        self.output = _StubTensor(name, shape)
+        if kernel:
+            self.kernel = None
+
+
+class _StubTensor:
+
+    def __init__(self, name, shape):
+        self.name = name
+        self.shape = shape
+
+
+def test_node_layer_outputs_skip_layers_without_weights():
+    model = type('Model', (), {})()
+    model.layers = [
+        _StubLayer('input', (None, 2)),
+        _StubLayer('dense_1', (None, 4), kernel=True),
+        _StubLayer('batch_norm', (None, 4)),
+        _StubLayer('activation', (None, 4)),
+        _StubLayer('dropout', (None, 4)),
+        _StubLayer('dense_2', (None, 2), kernel=True),
+        _StubLayer('dense_3', (None, 1), kernel=True),
+    ]
+    assert [output.name for output in _get_node_layer_outputs(model)] == ['dropout', 'dense_2', 'dense_3']
+
+
+def test_node_decision_boundaries_of_keras_model():
+    keras = pytest.importorskip('tensorflow.keras')
+    inputs = keras.Input(shape=(2,))
+    hidden = keras.layers.Dense(3, activation='tanh')(inputs)
+    hidden = keras.layers.Dropout(0.5)(hidden)
+    outputs = keras.layers.Dense(1, activation='tanh')(hidden)
+    model = keras.Model(inputs, outputs)
+
+    boundaries = get_node_decision_boundaries(model, density=10)
+    assert sorted(boundaries) == [(LayerType.L1, NeuronType.N1), (LayerType.L1, NeuronType.N2),
+                                  (LayerType.L1, NeuronType.N3), (LayerType.L2, NeuronType.N1)]
+    expected = model.predict(Player.get_boundary_array(10), verbose=0)
+    assert np.allclose(boundaries[(LayerType.L2, NeuronType.N1)], expected.reshape(10, 10), atol=1e-5)
+
+
+class _CountingModel:
+
+    def __init__(self):
+        self.weights = [np.array([[1.0], [-1.0]])]
+        self.calls = 0
+
+    def get_weights(self):
+        return [w.copy() for w in self.weights]
+
+    def predict(self, x, batch_size=32, verbose=0):
+        self.calls += 1
+        return np.tanh(x.dot(self.weights[0]))
+
+
+def test_predict_boundary_cached_per_weights():
+    clear_prediction_cache()
+    model = _CountingModel()
+    first = predict_boundary(model, density=10)
+    assert predict_boundary(model, density=10) is first
+    assert model.calls == 1
+
+    predict_boundary(model, density=12)
+    assert model.calls == 2
+
+    model.weights[0][0, 0] = 2.0
+    changed = predict_boundary(model, density=10)
+    assert model.calls == 3
+    assert not np.array_equal(changed, first)
+
+    predict_boundary(model, density=10, cache=False)
+    assert model.calls == 4
@@ -0,0 +1,66 @@
+import itertools
+import threading
+
+import numpy as np
+import pytest
+
+from plygdata.dataloader import BatchLoader
+
+
+def _make_data(n=103):
+    X = np.arange(n * 2, dtype=float).reshape(n, 2)
+    y = np.arange(n, dtype=float).reshape(n, 1)
+    return X, y
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_every_epoch_covers_all_rows(prefetch):
+    X, y = _make_data()
+    loader = BatchLoader(X, y, batch_size=10, epochs=2, prefetch=prefetch, seed=0)
+    assert len(loader) == 11
+
+    batches = list(loader)
+    assert len(batches) == 22
+    for X_batch, y_batch in batches:
+        assert np.array_equal(X_batch[:, 0], y_batch[:, 0] * 2)
+
+    epochs = [np.concatenate([y_batch for _, y_batch in batches[i:i + 11]]).ravel() for i in (0, 11)]
+    assert all(np.array_equal(np.sort(rows), y.ravel()) for rows in epochs)
+    assert not np.array_equal(epochs[0], epochs[1])
+
+
+def test_seeded_batches_are_reproducible():
+    X, y = _make_data()
+    a = list(BatchLoader(X, y, epochs=1, seed=1))
+    b = list(BatchLoader(X, y, epochs=1, seed=1))
+    assert all(np.array_equal(ya, yb) for (_, ya), (_, yb) in zip(a, b))
+
+
+def test_infinite_loader_stops_its_thread():
+    X, y = _make_data()
+    threads = threading.active_count()
+    iterator = iter(BatchLoader(X, y, batch_size=7))
+    assert len(list(itertools.islice(iterator, 50))) == 50
+    iterator.close()
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(1.0)
+    assert threading.active_count() == threads
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_iterator_is_a_keras_generator(prefetch):
+    # Keras takes a generator input when the object has __next__ (model.fit(iter(loader), ...)).
+    X, y = _make_data()
+    loader = BatchLoader(X, y, batch_size=10, prefetch=prefetch, seed=0)
+    iterator = iter(loader)
+    assert iter(iterator) is iterator
+    for _ in range(len(loader) * 3):
+        X_batch, y_batch = next(iterator)
+        assert len(X_batch) == len(y_batch) > 0
+    iterator.close()
+
+
+def test_length_mismatch():
+    with pytest.raises(ValueError):
+        BatchLoader(np.zeros((3, 2)), np.zeros((2, 1)))
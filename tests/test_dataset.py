@@ -0,0 +1,177 @@
+import numpy as np
+import pytest
+
+from plygdata.dataset import DataGenerator, NumpyDataGenerator, NoiseResampler, gaussian_label, rand_uniform_batch, normal_random_batch, generate_data, generate_data_batch, generate_data_chunks, generate_data_sharded, get_points_dtype, as_points, SEED_BLOCK_SIZE, NUM_SAMPLES_CLASSIFY, NUM_SAMPLES_REGRESS
+from plygdata.state import DatasetType, BackendType
+
+
+CLASSIFY_TYPES = [
+    DatasetType.ClassifyCircleData,
+    DatasetType.ClassifyXORData,
+    DatasetType.ClassifyTwoGaussData,
+    DatasetType.ClassifySpiralData,
+]
+REGRESS_TYPES = [
+    DatasetType.RegressPlane,
+    DatasetType.RegressGaussian,
+]
+
+
+@pytest.mark.parametrize('data_type', CLASSIFY_TYPES + REGRESS_TYPES)
+def test_numpy_backend_matches_python_backend_layout(data_type):
+    expected = np.array(generate_data(data_type, 0.2))
+    data = generate_data(data_type, 0.2, backend=BackendType.NumPy, seed=0)
+    assert isinstance(data, np.ndarray)
+    assert data.shape == expected.shape
+
+
+@pytest.mark.parametrize('data_type', CLASSIFY_TYPES)
+def test_numpy_backend_classify_labels(data_type):
+    data = generate_data(data_type, 0.0, backend=BackendType.NumPy, seed=1)
+    assert len(data) == NUM_SAMPLES_CLASSIFY
+    assert set(np.unique(data[:, 2])) == {-1.0, 1.0}
+
+
+def test_numpy_backend_noiseless_labels_follow_geometry():
+    xor = generate_data(DatasetType.ClassifyXORData, 0.0, backend=BackendType.NumPy, seed=2)
+    assert np.all((xor[:, 0] * xor[:, 1] >= 0) == (xor[:, 2] == 1))
+
+    circle = generate_data(DatasetType.ClassifyCircleData, 0.0, backend=BackendType.NumPy, seed=2)
+    assert np.all((np.hypot(circle[:, 0], circle[:, 1]) < 2.5) == (circle[:, 2] == 1))
+
+    plane = generate_data(DatasetType.RegressPlane, 0.0, backend=BackendType.NumPy, seed=2)
+    assert len(plane) == NUM_SAMPLES_REGRESS
+    assert np.allclose(plane[:, 2], (plane[:, 0] + plane[:, 1]) / 10.0)
+
+
+def test_numpy_backend_is_reproducible_from_seed():
+    a = generate_data(DatasetType.RegressGaussian, 0.1, backend=BackendType.NumPy, seed=3)
+    b = generate_data(DatasetType.RegressGaussian, 0.1, backend=BackendType.NumPy, seed=3)
+    c = generate_data(DatasetType.RegressGaussian, 0.1, backend=BackendType.NumPy, seed=4)
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a, c)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        generate_data(DatasetType.ClassifyXORData, backend='unknown')
+
+
+@pytest.mark.parametrize('backend', [BackendType.Python, BackendType.NumPy])
+def test_num_samples(backend):
+    assert len(generate_data(DatasetType.ClassifyXORData, num_samples=2000, backend=backend)) == 2000
+    assert len(generate_data(DatasetType.ClassifyCircleData, num_samples=7, backend=backend)) == 6
+    assert len(generate_data(DatasetType.RegressPlane, num_samples=10, backend=backend)) == 10
+
+
+def test_generate_data_batch_matches_generate_data():
+    configs = [
+        (DatasetType.ClassifySpiralData, 0.0, 1),
+        (DatasetType.ClassifyXORData, 0.1, 2),
+        (DatasetType.ClassifySpiralData, 0.3, 3),
+        (DatasetType.ClassifyTwoGaussData, 0.5, 4),
+    ]
+    batch = generate_data_batch(configs)
+    assert batch.shape == (4, NUM_SAMPLES_CLASSIFY, 3)
+    for points, (data_type, noise, seed) in zip(batch, configs):
+        expected = generate_data(data_type, noise, backend=BackendType.NumPy, seed=seed)
+        assert np.allclose(points, expected)
+
+
+def test_generate_data_batch_needs_same_num_samples():
+    configs = [(DatasetType.ClassifyXORData, 0.0), (DatasetType.RegressPlane, 0.0)]
+    with pytest.raises(ValueError):
+        generate_data_batch(configs)
+    assert generate_data_batch(configs, num_samples=100).shape == (2, 100, 3)
+
+
+@pytest.mark.parametrize('data_type', [DatasetType.ClassifySpiralData, DatasetType.RegressGaussian])
+@pytest.mark.parametrize('chunk_size', [999, SEED_BLOCK_SIZE, SEED_BLOCK_SIZE + 1])
+def test_generate_data_chunks_does_not_depend_on_chunk_size(data_type, chunk_size):
+    num_samples = SEED_BLOCK_SIZE * 2 + 5
+    expected = generate_data(data_type, 0.2, backend=BackendType.NumPy, seed=7, num_samples=num_samples)
+    chunks = list(generate_data_chunks(data_type, 0.2, chunk_size=chunk_size, num_samples=num_samples, seed=7))
+    assert all(len(chunk) == chunk_size for chunk in chunks[:-1])
+    assert np.array_equal(np.concatenate(chunks), expected)
+
+
+@pytest.mark.parametrize('num_workers', [1, 2, 3])
+def test_generate_data_sharded_does_not_depend_on_num_workers(num_workers):
+    num_samples = SEED_BLOCK_SIZE * 3 + 11
+    expected = generate_data(DatasetType.ClassifyCircleData, 0.1, backend=BackendType.NumPy, seed=8, num_samples=num_samples)
+    data = generate_data_sharded(DatasetType.ClassifyCircleData, 0.1, num_samples=num_samples, seed=8, num_workers=num_workers)
+    assert np.array_equal(data, expected)
+
+
+@pytest.mark.parametrize('backend', [BackendType.Python, BackendType.NumPy])
+def test_structured_points(backend):
+    dtype = get_points_dtype(DatasetType.ClassifyCircleData)
+    data = generate_data(DatasetType.ClassifyCircleData, 0.0, backend=backend, seed=9, dtype=dtype)
+    assert data.shape == (NUM_SAMPLES_CLASSIFY,)
+    assert data.dtype.itemsize == 9
+    assert data['label'].dtype == np.int8
+    assert np.all((np.hypot(data['x'], data['y']) < 2.5) == (data['label'] == 1))
+
+
+def test_compact_dtype_matches_float64():
+    expected = generate_data(DatasetType.RegressGaussian, 0.1, backend=BackendType.NumPy, seed=9)
+    data = generate_data(DatasetType.RegressGaussian, 0.1, backend=BackendType.NumPy, seed=9, dtype=np.float32)
+    assert data.dtype == np.float32
+    assert np.array_equal(data, expected.astype(np.float32))
+    assert np.array_equal(as_points(expected, np.float32), data)
+
+    chunks = generate_data_chunks(DatasetType.RegressGaussian, 0.1, chunk_size=100, seed=9, dtype=get_points_dtype(DatasetType.RegressGaussian))
+    assert np.array_equal(np.concatenate(list(chunks))['label'], data[:, 2])
+
+
+def test_batch_samplers():
+    u = rand_uniform_batch(-2.0, 3.0, (1000, 2), rng=0)
+    assert u.shape == (1000, 2)
+    assert u.min() >= -2.0 and u.max() < 3.0
+
+    z = normal_random_batch(1.0, 4.0, 100001, rng=0)
+    assert z.shape == (100001,)
+    assert abs(z.mean() - 1.0) < 0.05
+    assert abs(z.var() - 4.0) < 0.1
+    assert np.array_equal(z, normal_random_batch(1.0, 4.0, 100001, rng=0))
+    assert np.isscalar(normal_random_batch(rng=0))
+
+
+def test_gaussian_label_matches_python_backend():
+    data = np.array(DataGenerator.regress_gaussian(500))
+    assert np.allclose(gaussian_label(data[:, 0], data[:, 1]), data[:, 2])
+
+
+def test_regress_gaussian_with_custom_gaussians():
+    gaussians = [[0.0, 0.0, 1.0], [3.0, 3.0, -0.5]]
+    data = NumpyDataGenerator.regress_gaussian(1000, rng=1, gaussians=gaussians)
+    expected = np.array([[x, y, 0.0] for x, y, _ in data])
+    for cx, cy, sign in gaussians:
+        score = sign * np.clip(1.0 - np.hypot(data[:, 0] - cx, data[:, 1] - cy) / 2.0, 0.0, 1.0)
+        expected[:, 2] = np.where(np.abs(score) > np.abs(expected[:, 2]), score, expected[:, 2])
+    assert np.allclose(data, expected)
+    assert np.array_equal(NumpyDataGenerator.regress_gaussian(1000, rng=1)[:, :2], data[:, :2])
+
+
+@pytest.mark.parametrize('data_type', [DatasetType.ClassifyXORData, DatasetType.ClassifyCircleData, DatasetType.RegressGaussian])
+def test_noise_resampler_keeps_clean_coordinates(data_type):
+    resampler = NoiseResampler(data_type, 0.3, seed=10)
+    clean = generate_data(data_type, 0.0, backend=BackendType.NumPy, seed=10)
+    first = resampler.resample().copy()
+    second = resampler.resample()
+    assert second is resampler.points
+    assert np.array_equal(first[:, :2], clean[:, :2])
+    assert np.array_equal(second[:, :2], clean[:, :2])
+    assert not np.array_equal(first[:, 2], second[:, 2])
+    assert np.array_equal(NoiseResampler(data_type, 0.3, seed=10).resample(epoch=0), first)
+
+
+def test_noise_resampler_jitters_spiral():
+    resampler = NoiseResampler(DatasetType.ClassifySpiralData, 0.5, seed=11)
+    clean = generate_data(DatasetType.ClassifySpiralData, 0.0, backend=BackendType.NumPy, seed=11)
+    points = resampler.resample()
+    assert np.array_equal(points[:, 2], clean[:, 2])
+    assert 0 < np.abs(points[:, :2] - clean[:, :2]).max() <= 0.5
+
+    with pytest.raises(ValueError):
+        NoiseResampler(DatasetType.ClassifyTwoGaussData)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from plygdata.datahelper import split_data
+from plygdata.datashards import save_shards, save_split_shards, load_shards
+from plygdata.dataset import generate_data, get_points_dtype
+from plygdata.state import DatasetType, BackendType
+
+
+def test_save_and_load_shards(tmp_path):
+    data = generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=1)
+    manifest = save_shards(str(tmp_path), data, DatasetType.ClassifyXORData, 0.1, 1, shard_size=200)
+    assert manifest['num_samples'] == len(data)
+    assert len(manifest['splits']['data']['shards']) == 3
+
+    sharded = load_shards(str(tmp_path))
+    shards = sharded.get_shards()
+    assert all(isinstance(shard, np.memmap) for shard in shards)
+    assert np.array_equal(np.concatenate(shards), data)
+    assert sharded.manifest['data_type'] == DatasetType.ClassifyXORData
+
+
+def test_save_and_load_split_shards(tmp_path):
+    data = generate_data(DatasetType.RegressPlane, 0.0, backend=BackendType.NumPy, seed=2)
+    X_train, y_train, X_valid, y_valid = split_data(data, validation_size=0.25)
+    save_split_shards(str(tmp_path), X_train, y_train, X_valid, y_valid, shard_size=500)
+
+    sharded = load_shards(str(tmp_path))
+    assert sharded.split_names == ['train', 'valid']
+    assert sharded.manifest['splits']['valid']['start'] == len(X_train)
+    X, y = sharded.get_split('valid')
+    assert np.array_equal(X, X_valid)
+    assert np.array_equal(y, y_valid)
+    assert [x.shape[1] for x, _ in sharded.get_shard_xy('train')] == [2, 2]
+
+
+def test_save_again_replaces_shards(tmp_path):
+    data = generate_data(DatasetType.ClassifyCircleData, 0.1, backend=BackendType.NumPy, seed=3)
+    save_shards(str(tmp_path), data, seed=np.int64(3), shard_size=100)
+    manifest = save_shards(str(tmp_path), data[:150], seed=np.int64(3), shard_size=100)
+    assert manifest['seed'] == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['data-00000.npy', 'data-00001.npy', 'manifest.json']
+    assert np.array_equal(np.concatenate(load_shards(str(tmp_path)).get_shards()), data[:150])
+
+
+def test_shards_keep_the_dtype(tmp_path):
+    data = generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=4, dtype=np.float32)
+    manifest = save_shards(str(tmp_path / 'data'), data, shard_size=200)
+    assert manifest['dtype'] == np.dtype(np.float32).str
+    shards = load_shards(str(tmp_path / 'data')).get_shards()
+    assert all(shard.dtype == np.float32 for shard in shards)
+    assert np.array_equal(np.concatenate(shards), data)
+
+    X_train, y_train, X_valid, y_valid = split_data(data, validation_size=0.25, seed=4)
+    save_split_shards(str(tmp_path / 'split'), X_train, y_train, X_valid, y_valid)
+    X, y = load_shards(str(tmp_path / 'split')).get_split('train')
+    assert X.dtype == np.float32 and np.array_equal(X, X_train) and np.array_equal(y, y_train)
+
+
+def test_record_arrays_are_rejected(tmp_path):
+    data = generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=4,
+                         dtype=get_points_dtype(DatasetType.ClassifyXORData))
+    with pytest.raises(ValueError):
+        save_shards(str(tmp_path), data)
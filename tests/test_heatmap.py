@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from plygdata.heatmap import HeatMap
+
+
+def test_reduce_matrix_divisible():
+    matrix = np.arange(24, dtype=float).reshape(4, 6)
+    reduced = HeatMap.reduceMatrix(matrix, 2)
+    assert reduced.shape == (2, 3)
+    assert reduced[0, 0] == np.mean([0, 1, 6, 7])
+    assert reduced[1, 2] == np.mean([16, 17, 22, 23])
+
+
+def test_reduce_matrix_not_divisible():
+    matrix = np.arange(35, dtype=float).reshape(5, 7)
+    assert HeatMap.reduceMatrix(matrix, 2, mode='crop').shape == (2, 3)
+
+    padded = HeatMap.reduceMatrix(matrix, (2, 3), mode='pad')
+    assert padded.shape == (3, 3)
+    assert padded[2, 2] == matrix[4, 6]
+    assert padded[0, 2] == np.mean([6, 13])
+    assert np.isclose(padded[1, 1], matrix[2:4, 3:6].mean())
+
+    with pytest.raises(ValueError):
+        HeatMap.reduceMatrix(matrix, 2, mode='wrap')
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from plygdata.datahelper import split_data, get_node_decision_boundaries, predict_boundary
+from plygdata.dataset import generate_data
+from plygdata.nn import Network, forward_prop, back_prop, Errors
+from plygdata.state import DatasetType, BackendType, LayerType, NeuronType
+
+
+@pytest.mark.parametrize('activation', ['relu', 'tanh', 'sigmoid', 'linear'])
+def test_back_prop_matches_numerical_derivatives(activation):
+    model = Network(network_shape=(3, 2), activation=activation, seed=0)
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=(5, 2))
+    y = rng.uniform(-1, 1, size=(5, 1))
+
+    def loss():
+        _, outputs = forward_prop(model.weights, model.biases, x, model.activation, model.output_activation)
+        return Errors.square(outputs[-1], y).sum()
+
+    totals, outputs = forward_prop(model.weights, model.biases, x, model.activation, model.output_activation)
+    weight_ders, bias_ders = back_prop(model.weights, x, y, totals, outputs, model.activation, model.output_activation)
+
+    eps = 1e-6
+    for W, dW in zip(model.weights + model.biases, weight_ders + bias_ders):
+        numerical = np.zeros_like(W)
+        for index in np.ndindex(W.shape):
+            W[index] += eps
+            plus = loss()
+            W[index] -= 2 * eps
+            minus = loss()
+            W[index] += eps
+            numerical[index] = (plus - minus) / (2 * eps)
+        assert np.allclose(dW, numerical, atol=1e-5)
+
+
+def test_fit_learns_circle():
+    data = generate_data(DatasetType.ClassifyCircleData, 0.0, backend=BackendType.NumPy, seed=0)
+    X_train, y_train, X_valid, y_valid = split_data(data, seed=0)
+    model = Network(learning_rate=0.03, seed=0)
+    model.fit(X_train, y_train, epochs=200, seed=0)
+
+    accuracy = np.mean(np.sign(model.predict(X_valid)) == y_valid)
+    assert accuracy > 0.9
+
+
+def test_l1_regularization_kills_weights():
+    data = generate_data(DatasetType.ClassifyTwoGaussData, 0.0, backend=BackendType.NumPy, seed=0)
+    model = Network(network_shape=(8,), regularization='L1', regularization_rate=0.1, seed=0)
+    model.fit(data[:, :2], data[:, 2], epochs=20, seed=0)
+    assert model.dead[0].any()
+    assert np.all(model.weights[0][model.dead[0]] == 0)
+
+
+def test_plugs_into_boundary_helpers():
+    model = Network(network_shape=(4, 2), seed=0)
+    boundaries = get_node_decision_boundaries(model, density=10)
+    assert len(boundaries) == 4 + 2 + 1
+    assert np.allclose(boundaries[(LayerType.L3, NeuronType.N1)].ravel(), np.asarray(predict_boundary(model, density=10)).ravel())
+
+    weights = model.get_weights()
+    other = Network(network_shape=(4, 2), seed=1)
+    other.set_weights(weights)
+    assert np.array_equal(other.predict(np.ones((1, 2))), model.predict(np.ones((1, 2))))
+
+
+def test_unknown_activation():
+    with pytest.raises(ValueError):
+        Network(activation='softmax')
@@ -0,0 +1,106 @@
+import math
+import time
+
+import numpy as np
+import pytest
+
+from plygdata.playground import Player, INPUTS, POINT_DOMAIN
+from plygdata.state import InputType
+
+
+def test_construct_inputs_matches_scalar_inputs():
+    points = np.random.default_rng(0).uniform(-6.0, 6.0, (50, 2))
+    features = Player.construct_inputs(points)
+    assert features.shape == (50, len(INPUTS))
+    for col, nodeId in enumerate(INPUTS):
+        expected = [INPUTS[nodeId]['f'](x, y) for x, y in points]
+        assert np.allclose(features[:, col], expected)
+    assert np.allclose(features[:, 5], [math.sin(x) for x in points[:, 0]])
+
+
+def test_construct_inputs_reuses_out():
+    points = np.array([[1.0, 2.0], [-3.0, 0.5]])
+    out = np.empty((2, 2), dtype=np.float32)
+    features = Player.construct_inputs(points, [InputType.X1TimesX2, InputType.X2Squared], out=out)
+    assert features is out
+    assert np.allclose(out, [[2.0, 4.0], [-1.5, 0.25]])
+
+    with pytest.raises(ValueError):
+        Player.construct_inputs(points, ['unknown'])
+
+
+@pytest.mark.parametrize('density', [100, 37])
+def test_update_decision_boundary(density):
+    boundary = Player.update_decision_boundary(density=density)
+    assert set(boundary) == set(INPUTS)
+    assert boundary['x'].shape == (density, density)
+    assert np.allclose(boundary['x'][0], np.linspace(POINT_DOMAIN[0], POINT_DOMAIN[1], density))
+    assert np.allclose(boundary['y'][:, 0], np.linspace(POINT_DOMAIN[1], POINT_DOMAIN[0], density))
+    assert np.allclose(boundary['xTimesY'], boundary['x'] * boundary['y'])
+
+    discretized = Player.update_decision_boundary(discretize=True, density=density)
+    assert np.array_equal(discretized['sinY'], np.where(boundary['sinY'] >= 0, 1, -1))
+
+
+def test_get_boundary_array_is_cached_and_read_only():
+    grid = Player.get_boundary_array()
+    assert grid is Player.get_boundary_array()
+    assert not grid.flags.writeable
+    assert grid.shape == (100 * 100, 2)
+    boundary = Player.update_decision_boundary()
+    assert np.allclose(grid[:, 0], boundary['x'].ravel())
+    assert np.allclose(grid[:, 1], boundary['y'].ravel())
+
+    features = Player.get_boundary_array(density=20, domain=[-1.0, 1.0], input_ids=[InputType.X1, InputType.SinX2])
+    assert features.shape == (400, 2)
+    assert np.allclose(features[:, 1], np.sin(Player.get_boundary_array(20, [-1.0, 1.0])[:, 1]))
+
+
+def test_get_decision_boundary_of_node():
+    grid = Player.get_boundary_array(density=30)
+    probability = np.tanh(grid[:, 0] - grid[:, 1])
+    boundary = Player.get_decision_boundary_of_node(probability)
+    assert boundary.shape == (30, 30)
+    assert np.shares_memory(boundary, probability)
+    assert np.array_equal(boundary[3, 4], probability[3 * 30 + 4])
+
+    outputs = np.column_stack((probability, -probability, grid[:, 0]))
+    boundaries = Player.get_decision_boundary_of_node(outputs, discretize=True, density=30)
+    assert boundaries.shape == (3, 30, 30)
+    assert np.array_equal(boundaries[0], np.where(boundary >= 0, 1, -1))
+    assert np.array_equal(boundaries[2], np.where(Player.update_decision_boundary(density=30)['x'] >= 0, 1, -1))
+
+    with pytest.raises(ValueError):
+        Player.get_decision_boundary_of_node(probability, density=29)
+
+
+def test_get_adaptive_decision_boundary():
+    evaluated = []
+
+    def predict(X):
+        evaluated.append(len(X))
+        return np.tanh(2.0 * (X[:, 0] ** 2 + X[:, 1] ** 2 - 9.0))[:, np.newaxis]
+
+    boundary = Player.get_adaptive_decision_boundary(predict, density=200, tolerance=0.05)
+    full = predict(Player.get_boundary_array(200)).reshape(200, 200)
+    assert boundary.shape == (200, 200)
+    assert sum(evaluated[:-1]) < 0.2 * 200 * 200
+    assert np.abs(boundary - full).max() <= 0.05
+    assert np.array_equal(Player.get_adaptive_decision_boundary(predict, True, 200), np.where(full >= 0, 1, -1))
+
+
+def test_adaptive_decision_boundary_overhead_at_high_density():
+    # The bookkeeping of each level is O(density^2): a 1000 x 1000 boundary takes about 0.1 s
+    # outside predict (dense interpolation matrices took more than 1 s).
+    spent = []
+
+    def predict(X):
+        start = time.perf_counter()
+        prediction = np.tanh(2.0 * (X[:, 0] ** 2 + X[:, 1] ** 2 - 9.0))
+        spent.append(time.perf_counter() - start)
+        return prediction
+
+    start = time.perf_counter()
+    boundary = Player.get_adaptive_decision_boundary(predict, density=1000)
+    assert boundary.shape == (1000, 1000)
+    assert time.perf_counter() - start - sum(spent) < 0.6
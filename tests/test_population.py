@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from plygdata.dataset import generate_data
+from plygdata.playground import Player
+from plygdata.population import Population
+from plygdata.state import DatasetType, BackendType
+
+
+def _make_data():
+    data = generate_data(DatasetType.ClassifyXORData, 0.1, backend=BackendType.NumPy, seed=0, num_samples=100)
+    return data[:, :2], data[:, 2]
+
+
+@pytest.mark.parametrize('regularization', [None, 'L1', 'L2'])
+def test_members_train_like_single_networks(regularization):
+    X, y = _make_data()
+    population = Population(3, network_shape=(4, 2), learning_rate=[0.01, 0.03, 0.1],
+                            regularization=regularization, regularization_rate=[0.0, 0.001, 0.01], seed=0)
+    networks = [population.get_member(i) for i in range(3)]
+
+    losses = population.fit(X, y, epochs=5, seed=1)
+    assert losses.shape == (5, 3)
+
+    for i, network in enumerate(networks):
+        history = network.fit(X, y, epochs=5, seed=1)
+        assert np.allclose(losses[:, i], history)
+        for expected, actual in zip(network.get_weights(), population.get_member(i).get_weights()):
+            assert np.allclose(expected, actual)
+
+
+def test_per_member_data_and_boundaries():
+    X, y = _make_data()
+    population = Population(4, seed=0)
+    X_members = np.stack([X] * 4)
+    y_members = np.stack([y.reshape(-1, 1)] * 4)
+    losses = population.fit(X_members, y_members, epochs=2, seed=0)
+    assert losses.shape == (2, 4)
+
+    boundaries = population.get_decision_boundaries(density=10)
+    assert boundaries.shape == (4, 10, 10)
+    member = population.get_member(2)
+    expected = member.predict(Player.get_boundary_array(10))[:, 0].reshape(10, 10)
+    assert np.allclose(boundaries[2], expected)
+
+
+@pytest.mark.parametrize('size', [1, 3])
+def test_boundaries_have_a_member_axis(size):
+    population = Population(size, seed=0)
+    boundaries = population.get_decision_boundaries(density=10)
+    assert boundaries.shape == (size, 10, 10)
+    discretized = population.get_decision_boundaries(density=10, discretize=True)
+    assert np.array_equal(discretized, np.where(boundaries >= 0, 1.0, -1.0))
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+
+from plygdata.state import DatasetType
+from plygdata.sweep import get_sweep_configs, get_config_key, run_config, run_sweep, load_sweep_results
+
+def _crashing_run_config(config, density=None):
+    if config['noise'] == 0.5 and not os.environ.get('SWEEP_TEST_NO_CRASH'):
+        os._exit(1)
+    return run_config(config, density)
+
+
+def _make_configs():
+    return get_sweep_configs([DatasetType.ClassifyCircleData, DatasetType.RegressPlane], noises=[0.0, 0.2],
+                             validation_sizes=[0.5], model_settings=[{'network_shape': (3,), 'epochs': 2}],
+                             num_samples=40)
+
+
+def test_sweep_streams_every_config():
+    configs = _make_configs()
+    assert len(configs) == 4
+    results = list(run_sweep(configs, num_workers=2, density=8))
+    assert sorted(get_config_key(r['config']) for r in results) == sorted(get_config_key(c) for c in configs)
+    for result in results:
+        assert len(result['history']) == 2
+        assert result['boundary'].shape == (8, 8)
+        assert result['times']['total'] >= result['times']['train']
+
+
+def test_sweep_resumes(tmp_path):
+    configs = _make_configs()
+    results_path = str(tmp_path / 'results.jsonl')
+
+    sweep = run_sweep(configs, num_workers=1, results_path=results_path, density=8)
+    first = next(sweep)
+    sweep.close()
+    with open(results_path, 'a') as f:
+        f.write('{"config": ')    # a line cut by the interruption
+
+    rest = list(run_sweep(configs, num_workers=1, results_path=results_path, density=8))
+    assert len(rest) == 3
+    assert get_config_key(first['config']) not in [get_config_key(r['config']) for r in rest]
+
+    saved = load_sweep_results(results_path)
+    assert len(saved) == 4
+    assert np.array_equal(saved[0]['boundary'], first['boundary'])
+    assert list(run_sweep(configs, num_workers=1, results_path=results_path)) == []
+
+
+def test_sweep_reports_failures_after_retries():
+    configs = get_sweep_configs(['unknown'], num_samples=10)
+    results = list(run_sweep(configs, num_workers=2, max_retries=1))
+    assert len(results) == 1
+    assert 'error' in results[0]
+
+
+def test_crash_fails_only_its_config(tmp_path, monkeypatch):
+    configs = get_sweep_configs([DatasetType.ClassifyXORData], noises=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5],
+                                model_settings=[{'epochs': 1}], num_samples=20)
+    results_path = str(tmp_path / 'results.jsonl')
+
+    results = list(run_sweep(configs, num_workers=2, results_path=results_path, max_retries=1, run_fn=_crashing_run_config))
+    errors = [result['config']['noise'] for result in results if 'error' in result]
+    assert len(results) == 6 and errors == [0.5]
+
+    # The failed config is run again when resuming, the others are not, and its new result replaces the error.
+    monkeypatch.setenv('SWEEP_TEST_NO_CRASH', '1')
+    results = list(run_sweep(configs, num_workers=2, results_path=results_path, max_retries=0, run_fn=_crashing_run_config))
+    assert [result['config']['noise'] for result in results] == [0.5]
+    saved = load_sweep_results(results_path)
+    assert len(saved) == 6
+    assert not any('error' in result for result in saved)
+
+
+def test_numpy_values_in_configs(tmp_path):
+    configs = get_sweep_configs([DatasetType.RegressPlane], noises=np.array([0.1]),
+                                model_settings=[{'network_shape': np.array([2]), 'epochs': np.int64(1)}],
+                                seeds=np.arange(2), num_samples=np.int64(20))
+    assert type(configs[1]['seed']) is int
+    results_path = str(tmp_path / 'results.jsonl')
+    assert len(list(run_sweep(configs, num_workers=1, results_path=results_path))) == 2
+    assert [result['config'] for result in load_sweep_results(results_path)] == configs